@@ -0,0 +1,320 @@
+#micro benchmarks for the engine hot paths
+#run: python benchmark.py
+
+import timeit
+
+from board.chessboard import board
+from pieces.nullpiece import nullpiece
+from board.bitboard import bitboard, slide, FULL, ROOKSTEPS, BISHOPSTEPS
+from board.attacks import rookattacks, bishopattacks, queenattacks
+from board.mailbox import mailbox
+from player.AI import AI
+from player import batch
+from player.smp import smpsearch
+from pieces.values import pstscore
+import copy
+import math
+import os
+import random
+import time
+
+def middlegame():
+    #start position with a few pawns removed so the sliders have room
+    chessBoard=board()
+    chessBoard.createboard()
+    for row,col in ((1,3),(1,4),(6,3),(6,4),(6,1),(1,6)):
+        chessBoard.gameTiles[row][col].pieceonTile=nullpiece()
+    position=bitboard()
+    position.loadtiles(chessBoard.gameTiles)
+    return chessBoard.gameTiles,position
+
+
+#the rook and bishop legalmoveb from before the ray tables, kept as the benchmark
+#baseline: one while loop per direction with the count==0 first step and an alliance
+#string test on every square. The originals repeated all loops once per colour; here
+#the colour to capture is passed in as enemy. Their queen ran the rook's and the
+#bishop's loops one after the other
+def whilelooprook(gametiles,position,enemy):
+    legalmoves=[]
+    x=math.floor(position/8)
+    y=position%8
+    a=0
+    b=0
+    count=0
+    while True:
+        if(count==0):
+            a=x+1
+            b=y
+            count=count+1
+        else:
+            a=a+1
+        if(a<8 and gametiles[a][b].pieceonTile.alliance is None):
+            legalmoves.append([a,b])
+            continue
+        elif(a<8 and gametiles[a][b].pieceonTile.alliance==enemy):
+            legalmoves.append([a,b])
+            break
+        else:
+            break
+
+    count=0
+    while True:
+        if(count==0):
+            a=x-1
+            b=y
+            count=count+1
+        else:
+            a=a-1
+        if(a>=0 and gametiles[a][b].pieceonTile.alliance is None):
+            legalmoves.append([a,b])
+            continue
+        elif(a>=0 and gametiles[a][b].pieceonTile.alliance==enemy):
+            legalmoves.append([a,b])
+            break
+        else:
+            break
+
+    count=0
+    while True:
+        if(count==0):
+            a=x
+            b=y+1
+            count=count+1
+        else:
+            b=b+1
+        if(b<8 and gametiles[a][b].pieceonTile.alliance is None):
+            legalmoves.append([a,b])
+            continue
+        elif(b<8 and gametiles[a][b].pieceonTile.alliance==enemy):
+            legalmoves.append([a,b])
+            break
+        else:
+            break
+
+    count=0
+    while True:
+        if(count==0):
+            a=x
+            b=y-1
+            count=count+1
+        else:
+            b=b-1
+        if(b>=0 and gametiles[a][b].pieceonTile.alliance is None):
+            legalmoves.append([a,b])
+            continue
+        elif(b>=0 and gametiles[a][b].pieceonTile.alliance==enemy):
+            legalmoves.append([a,b])
+            break
+        else:
+            break
+    return legalmoves
+
+
+def whileloopbishop(gametiles,position,enemy):
+    legalmoves=[]
+    x=math.floor(position/8)
+    y=position%8
+    a=0
+    b=0
+    count=0
+    while True:
+        if(count==0):
+            a=x+1
+            b=y+1
+            count=count+1
+        else:
+            a=a+1
+            b=b+1
+        if(a<8 and b<8 and gametiles[a][b].pieceonTile.alliance is None):
+            legalmoves.append([a,b])
+            continue
+        elif(a<8 and b<8 and gametiles[a][b].pieceonTile.alliance==enemy):
+            legalmoves.append([a,b])
+            break
+        else:
+            break
+
+    count=0
+    while True:
+
+        if(count==0):
+            a=x-1
+            b=y-1
+            count=count+1
+        else:
+            a=a-1
+            b=b-1
+        if(a>=0 and b>=0 and gametiles[a][b].pieceonTile.alliance is None):
+            legalmoves.append([a,b])
+            continue
+        elif(a>=0 and b>=0 and gametiles[a][b].pieceonTile.alliance==enemy):
+            legalmoves.append([a,b])
+            break
+        else:
+            break
+
+    count=0
+    while True:
+        if(count==0):
+            a=x+1
+            b=y-1
+            count=count+1
+        else:
+            a=a+1
+            b=b-1
+        if(a<8 and b>=0 and gametiles[a][b].pieceonTile.alliance is None):
+            legalmoves.append([a,b])
+            continue
+        elif(a<8 and b>=0 and gametiles[a][b].pieceonTile.alliance==enemy):
+            legalmoves.append([a,b])
+            break
+        else:
+            break
+
+    count=0
+    while True:
+        if(count==0):
+            a=x-1
+            b=y+1
+            count=count+1
+        else:
+            a=a-1
+            b=b+1
+        if(a>=0 and b<8 and gametiles[a][b].pieceonTile.alliance is None):
+            legalmoves.append([a,b])
+            continue
+        elif(a>=0 and b<8 and gametiles[a][b].pieceonTile.alliance==enemy):
+            legalmoves.append([a,b])
+            break
+        else:
+            break
+    return legalmoves
+
+
+def whileloopqueen(gametiles,position,enemy):
+    return whilelooprook(gametiles,position,enemy)+whileloopbishop(gametiles,position,enemy)
+
+
+def fillattacks(sq,occ,steps):
+    empty=FULL^occ
+    attack=0
+    for step in steps:
+        attack|=slide(1<<sq,empty,step)
+    return attack
+
+
+def report(name,seconds,calls,baseline=None):
+    line=f"{name:<34}{seconds/calls*1e6:9.2f} us/call"
+    if baseline:
+        line+=f"  {baseline/seconds:6.1f}x"
+    print(line)
+
+
+def sliders(calls=20000):
+    gametiles,position=middlegame()
+    occ=position.occupied[0]|position.occupied[1]
+    print("sliding attacks (per piece, per call, speedup over the old while loops)")
+    for name,row,col,steps,whileloops,lookup in (("queen",7,3,ROOKSTEPS+BISHOPSTEPS,whileloopqueen,queenattacks),
+                                                 ("rook",7,0,ROOKSTEPS,whilelooprook,rookattacks),
+                                                 ("bishop",7,2,BISHOPSTEPS,whileloopbishop,bishopattacks)):
+        sq=row*8+col
+        piece=gametiles[row][col].pieceonTile
+        enemy='Black' if piece.alliance=='White' else 'White'
+        assert fillattacks(sq,occ,steps)==lookup(sq,occ)
+        assert sorted(whileloops(gametiles,sq,enemy))==sorted(piece.legalmoveb(gametiles))
+        loops=timeit.timeit(lambda:whileloops(gametiles,sq,enemy),number=calls)
+        tiles=timeit.timeit(lambda:piece.legalmoveb(gametiles),number=calls)
+        fill=timeit.timeit(lambda:fillattacks(sq,occ,steps),number=calls)
+        table=timeit.timeit(lambda:lookup(sq,occ),number=calls)
+        report(f"  {name} while loops (tiles)",loops,calls)
+        report(f"  {name}.legalmoveb rays (tiles)",tiles,calls,loops)
+        report(f"  {name} ray fill (bitboard)",fill,calls,loops)
+        report(f"  {name} table lookup (bitboard)",table,calls,loops)
+
+
+def copies(calls=2000):
+    gametiles,position=middlegame()
+    compact=mailbox()
+    compact.loadposition(position)
+    print("board copies (per call)")
+    tiles=timeit.timeit(lambda:copy.deepcopy(gametiles),number=calls)
+    report("  deepcopy(gameTiles)",tiles,calls)
+    report("  bitboard.copy()",timeit.timeit(position.copy,number=calls),calls,tiles)
+    report("  mailbox.copy()",timeit.timeit(compact.copy,number=calls),calls,tiles)
+
+
+def search(depths=(3,4)):
+    gametiles,position=middlegame()
+    print("AI.evaluate on the middlegame position")
+    for depth in depths:
+        ai=AI()
+        random.seed(0)
+        start=time.perf_counter()
+        ai.evaluate(position.copy(),depth)
+        seconds=time.perf_counter()-start
+        print(f"  depth {depth}: {seconds:7.2f}s {ai.nodes:>8} nodes {ai.nodes/seconds:8.0f} nps  {ai.tt.report()}")
+
+
+def positions(count,seed=0):
+    #positions from random games out of the start position
+    rng=random.Random(seed)
+    result=[]
+    position=bitboard()
+    position.loadfen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1")
+    while len(result)<count:
+        moves=position.legalmoves()
+        if not moves or len(position.history)>=100:
+            while position.history:
+                position.unmake()
+            continue
+        position.make(rng.choice(moves))
+        result.append(position.copy())
+    return result
+
+
+def batcheval(count=10000):
+    print(f"evaluating {count} positions")
+    if batch.np is None:
+        print("  numpy is not installed, skipping")
+        return
+    sample=positions(count)
+    boards=batch.encode(sample)
+    start=time.perf_counter()
+    scan=[pstscore(position.squares) for position in sample]
+    loop=time.perf_counter()-start
+    start=time.perf_counter()
+    scores=batch.evaluate(boards)
+    vector=time.perf_counter()-start
+    assert scores.tolist()==scan==[position.score for position in sample]
+    report("  full scan per position",loop,count)
+    report("  batch.evaluate",vector,count,loop)
+
+
+def smp(depth=5,workers=None):
+    #time to finish the same depth with 1, 2, 4... processes against the plain AI.evaluate
+    gametiles,position=middlegame()
+    workers=workers or os.cpu_count() or 1
+    print(f"lazy SMP to depth {depth} ({os.cpu_count()} cpus)")
+    ai=AI()
+    start=time.perf_counter()
+    ai.evaluate(position.copy(),depth)
+    single=time.perf_counter()-start
+    print(f"  AI.evaluate        {single:7.2f}s {ai.nodes:>8} nodes")
+    count=1
+    while True:
+        search=smpsearch(count)
+        start=time.perf_counter()
+        search.evaluate(position.copy(),depth)
+        seconds=time.perf_counter()-start
+        print(f"  {count:>2} workers         {seconds:7.2f}s {search.nodes:>8} nodes  {single/seconds:5.2f}x  reached depth {search.completed}")
+        if count>=workers:
+            break
+        count=min(count*2,workers)
+
+
+if __name__=='__main__':
+    sliders()
+    copies()
+    search()
+    batcheval()
+    smp()
@@ -0,0 +1,125 @@
+#square indexed attack tables, built once at import
+#squares are row*8+col like Tile.tileCoordinate; each table comes as a list of
+#target squares (for the tile board) and as a bitboard mask (for the bitboard)
+
+from pieces.codes import WHITE, BLACK
+
+KNIGHTOFFSETS=((-2,1),(-1,2),(-2,-1),(-1,-2),(2,1),(1,2),(2,-1),(1,-2))
+KINGOFFSETS=((1,1),(1,-1),(1,0),(0,-1),(0,1),(-1,0),(-1,-1),(-1,1))
+#white pawns move towards row 0, black pawns towards row 7
+PAWNOFFSETS=(((-1,-1),(-1,1)),((1,-1),(1,1)))
+
+
+def leapertargets(sq,offsets):
+    row,col=divmod(sq,8)
+    targets=[]
+    for dr,dc in offsets:
+        r=row+dr
+        c=col+dc
+        if 0<=r<8 and 0<=c<8:
+            targets.append(r*8+c)
+    return targets
+
+def tomask(squares):
+    mask=0
+    for sq in squares:
+        mask|=1<<sq
+    return mask
+
+
+KNIGHT_SQUARES=[leapertargets(sq,KNIGHTOFFSETS) for sq in range(64)]
+KING_SQUARES=[leapertargets(sq,KINGOFFSETS) for sq in range(64)]
+PAWN_SQUARES=[[leapertargets(sq,PAWNOFFSETS[color]) for sq in range(64)] for color in (WHITE,BLACK)]
+
+KNIGHT_ATTACKS=[tomask(targets) for targets in KNIGHT_SQUARES]
+KING_ATTACKS=[tomask(targets) for targets in KING_SQUARES]
+PAWN_ATTACKS=[[tomask(targets) for targets in PAWN_SQUARES[color]] for color in (WHITE,BLACK)]
+
+
+#sliding pieces: rays for walking the tile board, and per square dictionaries keyed
+#by the relevant occupancy (the ray squares minus the board edge) for the bitboard
+ROOKDIRECTIONS=((1,0),(-1,0),(0,1),(0,-1))
+BISHOPDIRECTIONS=((1,1),(-1,-1),(1,-1),(-1,1))
+
+
+def raysquares(sq,direction):
+    row,col=divmod(sq,8)
+    dr,dc=direction
+    ray=[]
+    row+=dr
+    col+=dc
+    while 0<=row<8 and 0<=col<8:
+        ray.append(row*8+col)
+        row+=dr
+        col+=dc
+    return ray
+
+def subsets(mask):
+    sub=0
+    while True:
+        yield sub
+        sub=(sub-mask)&mask
+        if sub==0:
+            break
+
+def slidingtable(rays):
+    #each ray only sees its own blockers, so tabulate the rays separately and
+    #combine them for every subset of the full mask
+    mask=0
+    raytables=[]
+    for ray in rays:
+        inner=tomask(ray[:-1])
+        mask|=inner
+        table={}
+        for sub in subsets(inner):
+            attack=0
+            for sq in ray:
+                attack|=1<<sq
+                if sub>>sq&1:
+                    break
+            table[sub]=attack
+        raytables.append((inner,table))
+    table={}
+    for sub in subsets(mask):
+        attack=0
+        for inner,raytable in raytables:
+            attack|=raytable[sub&inner]
+        table[sub]=attack
+    return mask,table
+
+
+ROOK_RAYS=[[raysquares(sq,d) for d in ROOKDIRECTIONS] for sq in range(64)]
+BISHOP_RAYS=[[raysquares(sq,d) for d in BISHOPDIRECTIONS] for sq in range(64)]
+QUEEN_RAYS=[BISHOP_RAYS[sq]+ROOK_RAYS[sq] for sq in range(64)]
+
+ROOK_MASKS=[]
+ROOK_TABLES=[]
+BISHOP_MASKS=[]
+BISHOP_TABLES=[]
+for sq in range(64):
+    mask,table=slidingtable(ROOK_RAYS[sq])
+    ROOK_MASKS.append(mask)
+    ROOK_TABLES.append(table)
+    mask,table=slidingtable(BISHOP_RAYS[sq])
+    BISHOP_MASKS.append(mask)
+    BISHOP_TABLES.append(table)
+
+
+def rookattacks(sq,occ):
+    return ROOK_TABLES[sq][occ&ROOK_MASKS[sq]]
+
+def bishopattacks(sq,occ):
+    return BISHOP_TABLES[sq][occ&BISHOP_MASKS[sq]]
+
+def queenattacks(sq,occ):
+    return ROOK_TABLES[sq][occ&ROOK_MASKS[sq]]|BISHOP_TABLES[sq][occ&BISHOP_MASKS[sq]]
+
+
+#squares strictly between two squares on a common rank, file or diagonal, 0 otherwise
+BETWEEN=[[0]*64 for sq in range(64)]
+for sq in range(64):
+    for ray in ROOK_RAYS[sq]+BISHOP_RAYS[sq]:
+        between=0
+        for target in ray:
+            BETWEEN[sq][target]=between
+            between|=1<<target
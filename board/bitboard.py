@@ -0,0 +1,713 @@
+from board.tile import Tile
+from board.attacks import KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS, BETWEEN, rookattacks, bishopattacks, queenattacks
+from pieces.codes import WHITE, BLACK, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, EMPTY, CODES, ALLIANCES, makecode, colorof, kindof
+from pieces.nullpiece import nullpiece
+from board.zobrist import PIECEKEYS, BLACKKEY, CASTLEKEYS, EPKEYS, fullkey
+from pieces.values import PST, pstscore
+from pieces.pawn import pawn
+from pieces.knight import knight
+from pieces.bishop import bishop
+from pieces.rook import rook
+from pieces.queen import queen
+from pieces.king import king
+
+#squares use the same numbering as Tile.tileCoordinate: row*8+col, a8=0 and h1=63
+#bit n of every bitboard is square n
+
+FULL=0xFFFFFFFFFFFFFFFF
+FILE_A=0x0101010101010101
+FILE_H=FILE_A<<7
+NOT_A=FULL^FILE_A
+NOT_H=FULL^FILE_H
+ROW_5=0xFF<<40
+ROW_2=0xFF<<16
+
+#moves are 16 bit ints: from | to<<6 | flag<<12
+QUIET=0
+DOUBLE=1
+KCASTLE=2
+QCASTLE=3
+CAPTURE=4
+EPCAPTURE=5
+PROMOTION=8
+
+WK=1
+WQ=2
+BK=4
+BQ=8
+CASTLEMASK=[15]*64
+CASTLEMASK[60]=15^(WK|WQ)
+CASTLEMASK[63]=15^WK
+CASTLEMASK[56]=15^WQ
+CASTLEMASK[4]=15^(BK|BQ)
+CASTLEMASK[7]=15^BK
+CASTLEMASK[0]=15^BQ
+
+PIECECLASSES=(pawn,knight,bishop,rook,queen,king)
+
+
+def encode(frm,to,flag=QUIET):
+    return frm|(to<<6)|(flag<<12)
+
+def movefrom(move):
+    return move&63
+
+def moveto(move):
+    return (move>>6)&63
+
+def moveflag(move):
+    return move>>12
+
+def movecoords(move):
+    #(from row, from col, to row, to col) for the tile board
+    frm=move&63
+    to=(move>>6)&63
+    return frm>>3,frm&7,to>>3,to&7
+
+def squarename(sq):
+    return 'abcdefgh'[sq&7]+str(8-(sq>>3))
+
+def movename(move):
+    #long algebraic, e.g. e2e4 or a7a8q
+    name=squarename(move&63)+squarename((move>>6)&63)
+    if move>>12&PROMOTION:
+        name+='nbrq'[move>>12&3]
+    return name
+
+def promotionpiece(move):
+    #'N', 'B', 'R' or 'Q' (as ChessGame.promote_pawn takes it) for a promotion, else None
+    if move>>12&PROMOTION:
+        return 'NBRQ'[move>>12&3]
+    return None
+
+def findmove(moves,frm,to,promotion=None):
+    #the move in a generated list that goes from frm to to (and promotes to the given
+    #piece kind, if any), None if there is none
+    for move in moves:
+        if move&63==frm and (move>>6)&63==to:
+            if promotion is None or (move>>12&PROMOTION and KNIGHT+(move>>12&3)==promotion):
+                return move
+    return None
+
+
+def north(b):
+    return b>>8
+
+def south(b):
+    return (b<<8)&FULL
+
+def east(b):
+    return (b<<1)&NOT_A
+
+def west(b):
+    return (b>>1)&NOT_H
+
+def northeast(b):
+    return (b>>7)&NOT_A
+
+def northwest(b):
+    return (b>>9)&NOT_H
+
+def southeast(b):
+    return (b<<9)&NOT_A
+
+def southwest(b):
+    return (b<<7)&NOT_H
+
+ROOKSTEPS=(north,south,east,west)
+BISHOPSTEPS=(northeast,northwest,southeast,southwest)
+
+
+def slide(b,empty,step):
+    #fills every ray from all the sliders in b at once, stopping on the first blocker;
+    #benchmark.py times it against the lookup tables in board/attacks.py
+    flood=b
+    b=step(b)&empty
+    while b:
+        flood|=b
+        b=step(b)&empty
+    return step(flood)
+
+
+class bitboard:
+
+    #set to True to check the incremental key and score against a full recompute after every make/unmake
+    checkkeys=False
+
+    def __init__(self):
+        self.pieces=[0]*12
+        self.occupied=[0,0]
+        self.squares=[EMPTY]*64
+        self.turn=WHITE
+        self.castling=0
+        self.ep=-1
+        self.kings=[-1,-1]
+        #zobrist key: the piece terms follow put/remove/make/unmake, call rekey() after
+        #setting turn, castling or ep by hand
+        self.key=CASTLEKEYS[0]
+        #material plus piece-square score from white's side, kept like the key
+        self.score=0
+        self.history=[]
+
+    def copy(self):
+        position=bitboard()
+        position.pieces=self.pieces[:]
+        position.occupied=self.occupied[:]
+        position.squares=self.squares[:]
+        position.turn=self.turn
+        position.castling=self.castling
+        position.ep=self.ep
+        position.kings=self.kings[:]
+        position.key=self.key
+        position.score=self.score
+        return position
+
+    def put(self,sq,code):
+        bit=1<<sq
+        self.pieces[code]|=bit
+        self.occupied[colorof(code)]|=bit
+        self.squares[sq]=code
+        self.key^=PIECEKEYS[code][sq]
+        self.score+=PST[code*64+sq]
+        if kindof(code)==KING:
+            self.kings[colorof(code)]=sq
+
+    def remove(self,sq):
+        code=self.squares[sq]
+        bit=1<<sq
+        self.pieces[code]^=bit
+        self.occupied[colorof(code)]^=bit
+        self.squares[sq]=EMPTY
+        self.key^=PIECEKEYS[code][sq]
+        self.score-=PST[code*64+sq]
+        if kindof(code)==KING:
+            self.kings[colorof(code)]=-1
+
+    def computekey(self):
+        return fullkey(self.squares,self.turn,self.castling,self.ep)
+
+    def rekey(self):
+        self.key=self.computekey()
+
+    def loadtiles(self,gametiles,turn=WHITE):
+        self.__init__()
+        self.turn=turn
+        for row in range(8):
+            for col in range(8):
+                code=gametiles[row][col].pieceonTile.code
+                if code!=EMPTY:
+                    self.put(row*8+col,code)
+
+        def unmoved(sq,code):
+            return self.squares[sq]==code and not getattr(gametiles[sq>>3][sq&7].pieceonTile,'moved',False)
+
+        for color,home,kside,qside in ((WHITE,60,WK,WQ),(BLACK,4,BK,BQ)):
+            if unmoved(home,makecode(color,KING)):
+                if unmoved(home+3,makecode(color,ROOK)):
+                    self.castling|=kside
+                if unmoved(home-4,makecode(color,ROOK)):
+                    self.castling|=qside
+
+        #only the pawn that has just made a double step can be taken en passant
+        other=turn^1
+        row=4 if other==WHITE else 3
+        for col in range(8):
+            sq=row*8+col
+            if self.squares[sq]==makecode(other,PAWN) and getattr(gametiles[row][col].pieceonTile,'enpassant',False):
+                target=sq+8 if other==WHITE else sq-8
+                if self.squares[target]==EMPTY:
+                    self.ep=target
+        self.rekey()
+
+    def loadfen(self,fen):
+        #FEN writes white in uppercase, this board (like tostring()) writes white in lowercase
+        fields=fen.split()
+        self.__init__()
+        for row,rank in enumerate(fields[0].split('/')):
+            col=0
+            for c in rank:
+                if c.isdigit():
+                    col+=int(c)
+                else:
+                    self.put(row*8+col,CODES[c.swapcase()])
+                    col+=1
+        if len(fields)>1 and fields[1]=='b':
+            self.turn=BLACK
+        if len(fields)>2:
+            for c,right in (('K',WK),('Q',WQ),('k',BK),('q',BQ)):
+                if c in fields[2]:
+                    self.castling|=right
+        if len(fields)>3 and fields[3]!='-':
+            self.ep=(8-int(fields[3][1]))*8+'abcdefgh'.index(fields[3][0])
+        self.rekey()
+
+    def totiles(self):
+        gametiles=[[0 for x in range(8)] for y in range(8)]
+        for sq in range(64):
+            code=self.squares[sq]
+            if code==EMPTY:
+                piece=nullpiece()
+            else:
+                color=colorof(code)
+                kind=kindof(code)
+                piece=PIECECLASSES[kind](ALLIANCES[color],sq)
+                if kind==KING:
+                    rights=(WK|WQ) if color==WHITE else (BK|BQ)
+                    piece.moved=not (sq==(60 if color==WHITE else 4) and self.castling&rights)
+                elif kind==ROOK:
+                    piece.moved=not self.castling&{63:WK,56:WQ,7:BK,0:BQ}.get(sq,0)
+                elif kind==PAWN and self.ep>=0:
+                    piece.enpassant=(sq==(self.ep-8 if color==WHITE else self.ep+8))
+            gametiles[sq>>3][sq&7]=Tile(sq,piece)
+        return gametiles
+
+    def kingsquare(self,color):
+        #kept up to date by put/remove/make/unmake
+        return self.kings[color]
+
+    def is_square_attacked(self,sq,by_color,occ=None):
+        #look outward from sq: a piece of by_color attacks sq exactly when a piece of
+        #the same kind standing on sq would attack it
+        pieces=self.pieces
+        base=by_color*6
+        if PAWN_ATTACKS[by_color^1][sq]&pieces[base+PAWN] or KNIGHT_ATTACKS[sq]&pieces[base+KNIGHT] \
+                or KING_ATTACKS[sq]&pieces[base+KING]:
+            return True
+        if occ is None:
+            occ=self.occupied[0]|self.occupied[1]
+        queens=pieces[base+QUEEN]
+        return bool(bishopattacks(sq,occ)&(pieces[base+BISHOP]|queens) or rookattacks(sq,occ)&(pieces[base+ROOK]|queens))
+
+    def attackers(self,sq,by_color,occ):
+        pieces=self.pieces
+        base=by_color*6
+        queens=pieces[base+QUEEN]
+        return (PAWN_ATTACKS[by_color^1][sq]&pieces[base+PAWN])|(KNIGHT_ATTACKS[sq]&pieces[base+KNIGHT]) \
+            |(KING_ATTACKS[sq]&pieces[base+KING])|(bishopattacks(sq,occ)&(pieces[base+BISHOP]|queens)) \
+            |(rookattacks(sq,occ)&(pieces[base+ROOK]|queens))
+
+    def pins(self,color):
+        #own pieces standing alone between the king and an enemy slider, with the squares
+        #each of them may still move to (the ray up to and including the pinner)
+        ksq=self.kings[color]
+        pieces=self.pieces
+        us=self.occupied[color]
+        them=self.occupied[color^1]
+        base=(color^1)*6
+        queens=pieces[base+QUEEN]
+        pinned=0
+        rays={}
+        for lookup,sliders in ((rookattacks,pieces[base+ROOK]|queens),(bishopattacks,pieces[base+BISHOP]|queens)):
+            #only enemy pieces block, so the lookup sees through our own men
+            pinners=lookup(ksq,them)&sliders
+            while pinners:
+                low=pinners&-pinners
+                pinners^=low
+                sq=low.bit_length()-1
+                blockers=BETWEEN[ksq][sq]&us
+                if blockers and not blockers&(blockers-1):
+                    pinned|=blockers
+                    rays[blockers.bit_length()-1]=BETWEEN[ksq][sq]|low
+        return pinned,rays
+
+    def incheck(self,color=None):
+        if color is None:
+            color=self.turn
+        return self.is_square_attacked(self.kingsquare(color),color^1)
+
+    def pseudomoves(self):
+        color=self.turn
+        base=color*6
+        pieces=self.pieces
+        us=self.occupied[color]
+        them=self.occupied[color^1]
+        occ=us|them
+        empty=FULL^occ
+        moves=[]
+
+        pawns=pieces[base+PAWN]
+        if color==WHITE:
+            single=north(pawns)&empty
+            double=north(single&ROW_5)&empty
+            forward=8
+            left=northwest(pawns)&them
+            right=northeast(pawns)&them
+            leftdelta=9
+            rightdelta=7
+            lastrow=0
+        else:
+            single=south(pawns)&empty
+            double=south(single&ROW_2)&empty
+            forward=-8
+            left=southwest(pawns)&them
+            right=southeast(pawns)&them
+            leftdelta=-7
+            rightdelta=-9
+            lastrow=7
+        for targets,delta,flag in ((single,forward,QUIET),(left,leftdelta,CAPTURE),(right,rightdelta,CAPTURE)):
+            while targets:
+                low=targets&-targets
+                to=low.bit_length()-1
+                targets^=low
+                frm=to+delta
+                if to>>3==lastrow:
+                    for promo in (QUEEN,KNIGHT,ROOK,BISHOP):
+                        moves.append(frm|(to<<6)|((PROMOTION|flag|(promo-KNIGHT))<<12))
+                else:
+                    moves.append(frm|(to<<6)|(flag<<12))
+        while double:
+            low=double&-double
+            to=low.bit_length()-1
+            double^=low
+            moves.append((to+2*forward)|(to<<6)|(DOUBLE<<12))
+        if self.ep>=0:
+            attackers=PAWN_ATTACKS[color^1][self.ep]&pawns
+            while attackers:
+                low=attackers&-attackers
+                frm=low.bit_length()-1
+                attackers^=low
+                moves.append(frm|(self.ep<<6)|(EPCAPTURE<<12))
+
+        for kind in (KNIGHT,BISHOP,ROOK,QUEEN,KING):
+            b=pieces[base+kind]
+            while b:
+                low=b&-b
+                frm=low.bit_length()-1
+                b^=low
+                if kind==KNIGHT:
+                    targets=KNIGHT_ATTACKS[frm]
+                elif kind==BISHOP:
+                    targets=bishopattacks(frm,occ)
+                elif kind==ROOK:
+                    targets=rookattacks(frm,occ)
+                elif kind==QUEEN:
+                    targets=queenattacks(frm,occ)
+                else:
+                    targets=KING_ATTACKS[frm]
+                targets&=~us
+                while targets:
+                    t=targets&-targets
+                    to=t.bit_length()-1
+                    targets^=t
+                    moves.append(frm|(to<<6)|((CAPTURE if t&them else QUIET)<<12))
+
+        if self.castling:
+            if color==WHITE:
+                home,kside,qside=60,WK,WQ
+            else:
+                home,kside,qside=4,BK,BQ
+            enemy=color^1
+            if self.castling&(kside|qside) and not self.is_square_attacked(home,enemy):
+                if self.castling&kside and not occ&(6<<home) \
+                        and not self.is_square_attacked(home+1,enemy) and not self.is_square_attacked(home+2,enemy):
+                    moves.append(home|((home+2)<<6)|(KCASTLE<<12))
+                if self.castling&qside and not occ&(14<<(home-4)) \
+                        and not self.is_square_attacked(home-1,enemy) and not self.is_square_attacked(home-2,enemy):
+                    moves.append(home|((home-2)<<6)|(QCASTLE<<12))
+        return moves
+
+    def kingmoves(self):
+        #king steps, each tested with the king lifted off the board so it cannot hide
+        #behind itself on a checking ray
+        color=self.turn
+        enemy=color^1
+        ksq=self.kings[color]
+        them=self.occupied[enemy]
+        without=(self.occupied[color]|them)^(1<<ksq)
+        moves=[]
+        targets=KING_ATTACKS[ksq]&~self.occupied[color]
+        while targets:
+            t=targets&-targets
+            to=t.bit_length()-1
+            targets^=t
+            if not self.is_square_attacked(to,enemy,without):
+                moves.append(ksq|(to<<6)|((CAPTURE if t&them else QUIET)<<12))
+        return moves
+
+    def evasions(self,checkers):
+        #side to move is in check by checkers: king steps, and against a single checker
+        #the captures of it and the blocks on its ray, found by looking back from those
+        #few squares; a pinned piece can never answer a check so it is left out
+        moves=self.kingmoves()
+        if checkers&(checkers-1):
+            return moves
+        color=self.turn
+        enemy=color^1
+        ksq=self.kings[color]
+        base=color*6
+        pieces=self.pieces
+        them=self.occupied[enemy]
+        occ=self.occupied[color]|them
+        free=~self.pins(color)[0]
+        pawns=pieces[base+PAWN]&free
+        knights=pieces[base+KNIGHT]&free
+        queens=pieces[base+QUEEN]
+        diagonal=(pieces[base+BISHOP]|queens)&free
+        straight=(pieces[base+ROOK]|queens)&free
+        if color==WHITE:
+            forward,doublerow,lastrow=8,4,0
+        else:
+            forward,doublerow,lastrow=-8,3,7
+
+        targets=checkers|BETWEEN[ksq][checkers.bit_length()-1]
+        while targets:
+            low=targets&-targets
+            to=low.bit_length()-1
+            targets^=low
+            if low&them:
+                flag=CAPTURE
+                origins=PAWN_ATTACKS[enemy][to]&pawns
+            else:
+                flag=QUIET
+                frm=to+forward
+                origins=pawns&(1<<frm) if 0<=frm<64 else 0
+                if not origins and to>>3==doublerow and not occ>>(to+forward)&1 and pawns>>(to+2*forward)&1:
+                    moves.append((to+2*forward)|(to<<6)|(DOUBLE<<12))
+            while origins:
+                o=origins&-origins
+                frm=o.bit_length()-1
+                origins^=o
+                if to>>3==lastrow:
+                    for promo in (QUEEN,KNIGHT,ROOK,BISHOP):
+                        moves.append(frm|(to<<6)|((PROMOTION|flag|(promo-KNIGHT))<<12))
+                else:
+                    moves.append(frm|(to<<6)|(flag<<12))
+            origins=(KNIGHT_ATTACKS[to]&knights)|(bishopattacks(to,occ)&diagonal)|(rookattacks(to,occ)&straight)
+            while origins:
+                o=origins&-origins
+                origins^=o
+                moves.append((o.bit_length()-1)|(to<<6)|(flag<<12))
+
+        if self.ep>=0:
+            ep=self.ep
+            capsq=ep+8 if color==WHITE else ep-8
+            attackers=PAWN_ATTACKS[enemy][ep]&pawns
+            while attackers:
+                low=attackers&-attackers
+                attackers^=low
+                after=(occ^low^(1<<capsq))|(1<<ep)
+                if not self.attackers(ksq,enemy,after)&~(1<<capsq):
+                    moves.append((low.bit_length()-1)|(ep<<6)|(EPCAPTURE<<12))
+        return moves
+
+    def legalmoves(self):
+        #legal moves generated directly: pinned pieces stay on their pin ray and positions
+        #in check go to evasions(); only en passant needs a closer look
+        color=self.turn
+        enemy=color^1
+        ksq=self.kings[color]
+        if ksq<0:
+            return self.pseudomoves()
+        checkers=self.attackers(ksq,enemy,self.occupied[0]|self.occupied[1])
+        if checkers:
+            return self.evasions(checkers)
+        base=color*6
+        pieces=self.pieces
+        us=self.occupied[color]
+        them=self.occupied[enemy]
+        occ=us|them
+        empty=FULL^occ
+        moves=self.kingmoves()
+        pinned,rays=self.pins(color)
+
+        pawns=pieces[base+PAWN]
+        if color==WHITE:
+            single=north(pawns)&empty
+            double=north(single&ROW_5)&empty
+            forward=8
+            left=northwest(pawns)&them
+            right=northeast(pawns)&them
+            leftdelta=9
+            rightdelta=7
+            lastrow=0
+        else:
+            single=south(pawns)&empty
+            double=south(single&ROW_2)&empty
+            forward=-8
+            left=southwest(pawns)&them
+            right=southeast(pawns)&them
+            leftdelta=-7
+            rightdelta=-9
+            lastrow=7
+        for targets,delta,flag in ((single,forward,QUIET),(left,leftdelta,CAPTURE),(right,rightdelta,CAPTURE),(double,2*forward,DOUBLE)):
+            while targets:
+                low=targets&-targets
+                to=low.bit_length()-1
+                targets^=low
+                frm=to+delta
+                if pinned>>frm&1 and not rays[frm]&low:
+                    continue
+                if flag!=DOUBLE and to>>3==lastrow:
+                    for promo in (QUEEN,KNIGHT,ROOK,BISHOP):
+                        moves.append(frm|(to<<6)|((PROMOTION|flag|(promo-KNIGHT))<<12))
+                else:
+                    moves.append(frm|(to<<6)|(flag<<12))
+        if self.ep>=0:
+            ep=self.ep
+            capsq=ep+8 if color==WHITE else ep-8
+            attackers=PAWN_ATTACKS[enemy][ep]&pawns
+            while attackers:
+                low=attackers&-attackers
+                frm=low.bit_length()-1
+                attackers^=low
+                #both pawns leave the rank at once, which can uncover the king along it
+                after=(occ^low^(1<<capsq))|(1<<ep)
+                if not self.attackers(ksq,enemy,after)&~(1<<capsq):
+                    moves.append(frm|(ep<<6)|(EPCAPTURE<<12))
+
+        for kind in (KNIGHT,BISHOP,ROOK,QUEEN):
+            b=pieces[base+kind]
+            while b:
+                low=b&-b
+                frm=low.bit_length()-1
+                b^=low
+                if kind==KNIGHT:
+                    if low&pinned:
+                        continue
+                    targets=KNIGHT_ATTACKS[frm]
+                elif kind==BISHOP:
+                    targets=bishopattacks(frm,occ)
+                elif kind==ROOK:
+                    targets=rookattacks(frm,occ)
+                else:
+                    targets=queenattacks(frm,occ)
+                targets&=~us
+                if low&pinned:
+                    targets&=rays[frm]
+                while targets:
+                    t=targets&-targets
+                    to=t.bit_length()-1
+                    targets^=t
+                    moves.append(frm|(to<<6)|((CAPTURE if t&them else QUIET)<<12))
+
+        if self.castling:
+            if color==WHITE:
+                home,kside,qside=60,WK,WQ
+            else:
+                home,kside,qside=4,BK,BQ
+            if self.castling&kside and not occ&(6<<home) \
+                    and not self.is_square_attacked(home+1,enemy) and not self.is_square_attacked(home+2,enemy):
+                moves.append(home|((home+2)<<6)|(KCASTLE<<12))
+            if self.castling&qside and not occ&(14<<(home-4)) \
+                    and not self.is_square_attacked(home-1,enemy) and not self.is_square_attacked(home-2,enemy):
+                moves.append(home|((home-2)<<6)|(QCASTLE<<12))
+        return moves
+
+    def make(self,move):
+        frm=move&63
+        to=(move>>6)&63
+        flag=move>>12
+        color=self.turn
+        squares=self.squares
+        pieces=self.pieces
+        occupied=self.occupied
+        code=squares[frm]
+        captured=squares[to]
+        key=self.key
+        score=self.score
+        self.history.append((move,captured,self.castling,self.ep,key,score))
+        if self.ep>=0:
+            key^=EPKEYS[self.ep&7]
+
+        if flag==EPCAPTURE:
+            captured=makecode(color^1,PAWN)
+            capsq=to+8 if color==WHITE else to-8
+            pieces[captured]^=1<<capsq
+            occupied[color^1]^=1<<capsq
+            squares[capsq]=EMPTY
+            key^=PIECEKEYS[captured][capsq]
+            score-=PST[captured*64+capsq]
+        elif captured!=EMPTY:
+            pieces[captured]^=1<<to
+            occupied[color^1]^=1<<to
+            key^=PIECEKEYS[captured][to]
+            score-=PST[captured*64+to]
+
+        newcode=code
+        if flag&PROMOTION:
+            newcode=makecode(color,KNIGHT+(flag&3))
+        pieces[code]^=1<<frm
+        pieces[newcode]^=1<<to
+        occupied[color]^=(1<<frm)|(1<<to)
+        squares[frm]=EMPTY
+        squares[to]=newcode
+        key^=PIECEKEYS[code][frm]^PIECEKEYS[newcode][to]
+        score+=PST[newcode*64+to]-PST[code*64+frm]
+        if code==makecode(color,KING):
+            self.kings[color]=to
+
+        if flag==KCASTLE or flag==QCASTLE:
+            if flag==KCASTLE:
+                rfrom,rto=frm+3,frm+1
+            else:
+                rfrom,rto=frm-4,frm-1
+            rookcode=makecode(color,ROOK)
+            pieces[rookcode]^=(1<<rfrom)|(1<<rto)
+            occupied[color]^=(1<<rfrom)|(1<<rto)
+            squares[rfrom]=EMPTY
+            squares[rto]=rookcode
+            key^=PIECEKEYS[rookcode][rfrom]^PIECEKEYS[rookcode][rto]
+            score+=PST[rookcode*64+rto]-PST[rookcode*64+rfrom]
+
+        castling=self.castling&CASTLEMASK[frm]&CASTLEMASK[to]
+        key^=CASTLEKEYS[self.castling]^CASTLEKEYS[castling]^BLACKKEY
+        self.castling=castling
+        if flag==DOUBLE:
+            self.ep=(frm+to)>>1
+            key^=EPKEYS[frm&7]
+        else:
+            self.ep=-1
+        self.turn=color^1
+        self.key=key
+        self.score=score
+        if self.checkkeys:
+            assert key==self.computekey(),"zobrist key out of step after %d" % move
+            assert score==pstscore(squares),"score out of step after %d" % move
+
+    def unmake(self):
+        move,captured,castling,ep,self.key,self.score=self.history.pop()
+        frm=move&63
+        to=(move>>6)&63
+        flag=move>>12
+        color=self.turn^1
+        squares=self.squares
+        pieces=self.pieces
+        occupied=self.occupied
+        self.turn=color
+        self.castling=castling
+        self.ep=ep
+
+        newcode=squares[to]
+        code=makecode(color,PAWN) if flag&PROMOTION else newcode
+        pieces[newcode]^=1<<to
+        pieces[code]^=1<<frm
+        occupied[color]^=(1<<frm)|(1<<to)
+        squares[frm]=code
+        squares[to]=captured
+        if code==makecode(color,KING):
+            self.kings[color]=frm
+
+        if flag==EPCAPTURE:
+            squares[to]=EMPTY
+            capsq=to+8 if color==WHITE else to-8
+            pawncode=makecode(color^1,PAWN)
+            pieces[pawncode]^=1<<capsq
+            occupied[color^1]^=1<<capsq
+            squares[capsq]=pawncode
+        elif captured!=EMPTY:
+            pieces[captured]^=1<<to
+            occupied[color^1]^=1<<to
+
+        if flag==KCASTLE or flag==QCASTLE:
+            if flag==KCASTLE:
+                rfrom,rto=frm+3,frm+1
+            else:
+                rfrom,rto=frm-4,frm-1
+            rookcode=makecode(color,ROOK)
+            pieces[rookcode]^=(1<<rfrom)|(1<<rto)
+            occupied[color]^=(1<<rfrom)|(1<<rto)
+            squares[rto]=EMPTY
+            squares[rfrom]=rookcode
+        if self.checkkeys:
+            assert self.key==self.computekey(),"zobrist key out of step after undoing %d" % move
+            assert self.score==pstscore(squares),"score out of step after undoing %d" % move
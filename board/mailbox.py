@@ -0,0 +1,296 @@
+from board.attacks import KNIGHT_SQUARES, KING_SQUARES, PAWN_SQUARES
+from board.bitboard import bitboard, DOUBLE, KCASTLE, QCASTLE, CAPTURE, EPCAPTURE, PROMOTION, WK, WQ, BK, BQ, CASTLEMASK
+from pieces.codes import WHITE, BLACK, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, EMPTY, OFFBOARD, makecode
+
+#10x12 mailbox: the 8x8 board sits inside two sentinel rows top and bottom and one
+#sentinel column each side, so a ray or a leap off the board lands on OFFBOARD
+#moves and the en passant square use the 64 square numbering (row*8+col) of the bitboard
+
+MAILBOX120=[(sq>>3)*10+(sq&7)+21 for sq in range(64)]
+MAILBOX64=[-1]*120
+for sq in range(64):
+    MAILBOX64[MAILBOX120[sq]]=sq
+
+EMPTYBOARD=bytearray([OFFBOARD])*120
+for sq in range(64):
+    EMPTYBOARD[MAILBOX120[sq]]=EMPTY
+EMPTYBOARD=bytes(EMPTYBOARD)
+
+ROOKOFFSETS=(10,-10,1,-1)
+BISHOPOFFSETS=(11,-11,9,-9)
+
+
+class mailbox:
+
+    def __init__(self):
+        self.squares=bytearray(EMPTYBOARD)
+        self.turn=WHITE
+        self.castling=0
+        self.ep=-1
+        self.kings=[-1,-1]
+        #piece lists: the squares (0-63) of each side's pieces, and for an occupied square
+        #its slot in that list, so move generation never visits an empty square
+        self.piecelists=[[],[]]
+        self.slots=[0]*64
+        self.history=[]
+
+    def copy(self):
+        board=mailbox()
+        board.squares[:]=self.squares
+        board.turn=self.turn
+        board.castling=self.castling
+        board.ep=self.ep
+        board.kings=self.kings[:]
+        board.piecelists=[self.piecelists[WHITE][:],self.piecelists[BLACK][:]]
+        board.slots=self.slots[:]
+        return board
+
+    def loadposition(self,position):
+        self.__init__()
+        for sq in range(64):
+            self.squares[MAILBOX120[sq]]=position.squares[sq]
+        self.turn=position.turn
+        self.castling=position.castling
+        self.ep=position.ep
+        self.kings=position.kings[:]
+        self.indexpieces()
+
+    def indexpieces(self):
+        #rebuilds the piece lists from the squares
+        self.piecelists=[[],[]]
+        for sq in range(64):
+            code=self.squares[MAILBOX120[sq]]
+            if code!=EMPTY:
+                piecelist=self.piecelists[code//6]
+                self.slots[sq]=len(piecelist)
+                piecelist.append(sq)
+
+    def toposition(self):
+        position=bitboard()
+        for sq in range(64):
+            code=self.squares[MAILBOX120[sq]]
+            if code!=EMPTY:
+                position.put(sq,code)
+        position.turn=self.turn
+        position.castling=self.castling
+        position.ep=self.ep
+        position.rekey()
+        return position
+
+    def totiles(self):
+        return self.toposition().totiles()
+
+    def kingsquare(self,color):
+        #kept up to date by make/unmake
+        return self.kings[color]
+
+    def is_square_attacked(self,sq,by_color):
+        squares=self.squares
+        base=by_color*6
+        for frm in PAWN_SQUARES[by_color^1][sq]:
+            if squares[MAILBOX120[frm]]==base+PAWN:
+                return True
+        for frm in KNIGHT_SQUARES[sq]:
+            if squares[MAILBOX120[frm]]==base+KNIGHT:
+                return True
+        for frm in KING_SQUARES[sq]:
+            if squares[MAILBOX120[frm]]==base+KING:
+                return True
+        start=MAILBOX120[sq]
+        for offsets,slider in ((ROOKOFFSETS,base+ROOK),(BISHOPOFFSETS,base+BISHOP)):
+            for offset in offsets:
+                t=start+offset
+                while squares[t]==EMPTY:
+                    t+=offset
+                code=squares[t]
+                if code==slider or code==base+QUEEN:
+                    return True
+        return False
+
+    def incheck(self,color=None):
+        if color is None:
+            color=self.turn
+        return self.is_square_attacked(self.kingsquare(color),color^1)
+
+    def pseudomoves(self):
+        color=self.turn
+        squares=self.squares
+        base=color*6
+        if color==WHITE:
+            forward,startrow,lastrow=-10,6,0
+        else:
+            forward,startrow,lastrow=10,1,7
+        moves=[]
+        for sq in self.piecelists[color]:
+            f=MAILBOX120[sq]
+            kind=squares[f]-base
+            if kind==PAWN:
+                promotes=(sq>>3)+(1 if color==BLACK else -1)==lastrow
+                t=f+forward
+                if squares[t]==EMPTY:
+                    to=MAILBOX64[t]
+                    if promotes:
+                        for promo in (QUEEN,KNIGHT,ROOK,BISHOP):
+                            moves.append(sq|(to<<6)|((PROMOTION|(promo-KNIGHT))<<12))
+                    else:
+                        moves.append(sq|(to<<6))
+                        if sq>>3==startrow and squares[t+forward]==EMPTY:
+                            moves.append(sq|(MAILBOX64[t+forward]<<6)|(DOUBLE<<12))
+                for to in PAWN_SQUARES[color][sq]:
+                    target=squares[MAILBOX120[to]]
+                    if target<EMPTY and target//6!=color:
+                        if promotes:
+                            for promo in (QUEEN,KNIGHT,ROOK,BISHOP):
+                                moves.append(sq|(to<<6)|((PROMOTION|CAPTURE|(promo-KNIGHT))<<12))
+                        else:
+                            moves.append(sq|(to<<6)|(CAPTURE<<12))
+                    elif to==self.ep:
+                        moves.append(sq|(to<<6)|(EPCAPTURE<<12))
+            elif kind==KNIGHT or kind==KING:
+                for to in (KNIGHT_SQUARES[sq] if kind==KNIGHT else KING_SQUARES[sq]):
+                    target=squares[MAILBOX120[to]]
+                    if target==EMPTY:
+                        moves.append(sq|(to<<6))
+                    elif target//6!=color:
+                        moves.append(sq|(to<<6)|(CAPTURE<<12))
+            else:
+                if kind==ROOK:
+                    offsets=ROOKOFFSETS
+                elif kind==BISHOP:
+                    offsets=BISHOPOFFSETS
+                else:
+                    offsets=ROOKOFFSETS+BISHOPOFFSETS
+                for offset in offsets:
+                    t=f+offset
+                    while squares[t]==EMPTY:
+                        moves.append(sq|(MAILBOX64[t]<<6))
+                        t+=offset
+                    target=squares[t]
+                    if target!=OFFBOARD and target//6!=color:
+                        moves.append(sq|(MAILBOX64[t]<<6)|(CAPTURE<<12))
+
+        if self.castling:
+            if color==WHITE:
+                home,kside,qside=60,WK,WQ
+            else:
+                home,kside,qside=4,BK,BQ
+            h=MAILBOX120[home]
+            enemy=color^1
+            if self.castling&(kside|qside) and not self.is_square_attacked(home,enemy):
+                if self.castling&kside and squares[h+1]==EMPTY and squares[h+2]==EMPTY \
+                        and not self.is_square_attacked(home+1,enemy) and not self.is_square_attacked(home+2,enemy):
+                    moves.append(home|((home+2)<<6)|(KCASTLE<<12))
+                if self.castling&qside and squares[h-1]==EMPTY and squares[h-2]==EMPTY and squares[h-3]==EMPTY \
+                        and not self.is_square_attacked(home-1,enemy) and not self.is_square_attacked(home-2,enemy):
+                    moves.append(home|((home-2)<<6)|(QCASTLE<<12))
+        return moves
+
+    def legalmoves(self):
+        moves=[]
+        color=self.turn
+        for move in self.pseudomoves():
+            self.make(move)
+            if not self.is_square_attacked(self.kingsquare(color),color^1):
+                moves.append(move)
+            self.unmake()
+        return moves
+
+    def make(self,move):
+        frm=move&63
+        to=(move>>6)&63
+        flag=move>>12
+        color=self.turn
+        squares=self.squares
+        f=MAILBOX120[frm]
+        t=MAILBOX120[to]
+        self.history.append((move,squares[t],self.castling,self.ep))
+        if flag==EPCAPTURE:
+            squares[t+10 if color==WHITE else t-10]=EMPTY
+            self.takeoff(color^1,to+8 if color==WHITE else to-8)
+        elif squares[t]!=EMPTY:
+            self.takeoff(color^1,to)
+        slots=self.slots
+        own=self.piecelists[color]
+        slot=slots[frm]
+        own[slot]=to
+        slots[to]=slot
+        if flag&PROMOTION:
+            squares[t]=makecode(color,KNIGHT+(flag&3))
+        else:
+            squares[t]=squares[f]
+        squares[f]=EMPTY
+        if squares[t]==makecode(color,KING):
+            self.kings[color]=to
+        if flag==KCASTLE:
+            squares[f+1]=squares[f+3]
+            squares[f+3]=EMPTY
+            slot=slots[frm+3]
+            own[slot]=frm+1
+            slots[frm+1]=slot
+        elif flag==QCASTLE:
+            squares[f-1]=squares[f-4]
+            squares[f-4]=EMPTY
+            slot=slots[frm-4]
+            own[slot]=frm-1
+            slots[frm-1]=slot
+
+        self.castling&=CASTLEMASK[frm]&CASTLEMASK[to]
+        self.ep=(frm+to)>>1 if flag==DOUBLE else -1
+        self.turn=color^1
+
+    def takeoff(self,color,sq):
+        #a captured piece leaves its list: the last entry moves into its slot
+        piecelist=self.piecelists[color]
+        last=piecelist.pop()
+        if last!=sq:
+            slot=self.slots[sq]
+            piecelist[slot]=last
+            self.slots[last]=slot
+
+    def puton(self,color,sq):
+        piecelist=self.piecelists[color]
+        self.slots[sq]=len(piecelist)
+        piecelist.append(sq)
+
+    def unmake(self):
+        move,captured,castling,ep=self.history.pop()
+        frm=move&63
+        to=(move>>6)&63
+        flag=move>>12
+        color=self.turn^1
+        squares=self.squares
+        f=MAILBOX120[frm]
+        t=MAILBOX120[to]
+        self.turn=color
+        self.castling=castling
+        self.ep=ep
+        slots=self.slots
+        own=self.piecelists[color]
+        slot=slots[to]
+        own[slot]=frm
+        slots[frm]=slot
+
+        if flag&PROMOTION:
+            squares[f]=makecode(color,PAWN)
+        else:
+            squares[f]=squares[t]
+            if squares[f]==makecode(color,KING):
+                self.kings[color]=frm
+        squares[t]=captured
+        if flag==EPCAPTURE:
+            squares[t+10 if color==WHITE else t-10]=makecode(color^1,PAWN)
+            self.puton(color^1,to+8 if color==WHITE else to-8)
+        elif captured!=EMPTY:
+            self.puton(color^1,to)
+        elif flag==KCASTLE:
+            squares[f+3]=squares[f+1]
+            squares[f+1]=EMPTY
+            slot=slots[frm+1]
+            own[slot]=frm+3
+            slots[frm+3]=slot
+        elif flag==QCASTLE:
+            squares[f-4]=squares[f-1]
+            squares[f-1]=EMPTY
+            slot=slots[frm-1]
+            own[slot]=frm-4
+            slots[frm-4]=slot
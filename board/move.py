@@ -1,28 +1,76 @@
-from pieces.nullpiece import nullpiece
+from board.attacks import KNIGHT_SQUARES, KING_SQUARES, PAWN_SQUARES, ROOK_RAYS, BISHOP_RAYS
+from board.bitboard import bitboard, movefrom, moveto, moveflag, movecoords, KCASTLE, QCASTLE, EPCAPTURE
+from pieces.codes import WHITE, BLACK, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, EMPTY, CODES, CHARS, ALLIANCECODES, makecode
 
 
 class move:
 
     def __init__(self):
-        pass
-
-    def checkb(self,gametiles):
-        x=0
-        y=0
+        #last known king squares, checked before use so a stale entry only costs a rescan
+        self.kings={'k':0,'K':0}
+
+    def kingsquare(self,gametiles,king):
+        sq=self.kings[king]
+        code=CODES[king]
+        if gametiles[sq>>3][sq&7].pieceonTile.code==code:
+            return sq
         for m in range(8):
             for k in range(8):
-                if(gametiles[m][k].pieceonTile.tostring()=='K'):
-                    x=m
-                    y=k
-        for m in range(8):
-            for k in range(8):
-                if(gametiles[m][k].pieceonTile.alliance=='White'):
-                    moves=gametiles[m][k].pieceonTile.legalmoveb(gametiles)
-                    for move in moves:
-                        if(move[0]==x and move[1]==y):
-                            return["checked",[m,k]]
+                if(gametiles[m][k].pieceonTile.code==code):
+                    self.kings[king]=m*8+k
+                    return m*8+k
+        return 0
+
+    def attacker(self,gametiles,square,by_color):
+        #look outward from square for a piece of by_color that attacks it
+        color=ALLIANCECODES[by_color]
+        #a pawn of by_color attacks square from where an enemy pawn on square would capture
+        pawn=makecode(color,PAWN)
+        for sq in PAWN_SQUARES[color^1][square]:
+            if gametiles[sq>>3][sq&7].pieceonTile.code==pawn:
+                return [sq>>3,sq&7]
+        knight=makecode(color,KNIGHT)
+        for sq in KNIGHT_SQUARES[square]:
+            if gametiles[sq>>3][sq&7].pieceonTile.code==knight:
+                return [sq>>3,sq&7]
+        queen=makecode(color,QUEEN)
+        for rays,slider in ((ROOK_RAYS,makecode(color,ROOK)),(BISHOP_RAYS,makecode(color,BISHOP))):
+            for ray in rays[square]:
+                for sq in ray:
+                    piece=gametiles[sq>>3][sq&7].pieceonTile.code
+                    if piece==EMPTY:
+                        continue
+                    if piece==slider or piece==queen:
+                        return [sq>>3,sq&7]
+                    break
+        king=makecode(color,KING)
+        for sq in KING_SQUARES[square]:
+            if gametiles[sq>>3][sq&7].pieceonTile.code==king:
+                return [sq>>3,sq&7]
+        return None
+
+    def is_square_attacked(self,gametiles,square,by_color):
+        return self.attacker(gametiles,square,by_color) is not None
+
+    def checkb(self,gametiles):
+        attacker=self.attacker(gametiles,self.kingsquare(gametiles,'K'),'White')
+        if attacker is not None:
+            return["checked",attacker]
         return["notchecked"]
 
+    def legalmoves(self,gametiles,alliance):
+        #the bitboard works out pins and check masks once for the whole position
+        #instead of playing every candidate on the tiles and running a check test
+        position=bitboard()
+        position.loadtiles(gametiles,ALLIANCECODES[alliance])
+        return position.legalmoves()
+
+    def legaltargets(self,gametiles,moves,y,x,alliance):
+        #keeps the [row,col] targets of the piece on (y,x) that are legal
+        frm=y*8+x
+        legal={moveto(m) for m in self.legalmoves(gametiles,alliance) if movefrom(m)==frm}
+        return [move for move in moves if move[0]*8+move[1] in legal]
+
     def updateposition(self,x,y):
         a=x*8
         b=a+y
@@ -30,155 +78,75 @@ class move:
 
     def movesifcheckedb(self,gametiles):
         movi=[]
-        piece=None
-        for m in range(8):
-            for k in range(8):
-                if(gametiles[m][k].pieceonTile.alliance=='Black'):
-                    moves=gametiles[m][k].pieceonTile.legalmoveb(gametiles)
-                    for move in moves:
-                        x=move[0]
-                        y=move[1]
-                        piece=gametiles[x][y].pieceonTile
-                        gametiles[x][y].pieceonTile=gametiles[m][k].pieceonTile
-                        gametiles[m][k].pieceonTile=nullpiece()
-                        s=self.updateposition(x,y)
-                        gametiles[x][y].pieceonTile.position=s
-                        if(self.checkb(gametiles)[0]=='notchecked'):
-                            movi.append([m,k,x,y])
-                        gametiles[m][k].pieceonTile=gametiles[x][y].pieceonTile
-                        gametiles[x][y].pieceonTile=piece
-                        s=self.updateposition(m,k)
-                        gametiles[m][k].pieceonTile.position=s
-
-
+        for m in self.legalmoves(gametiles,'Black'):
+            #castling and en passant never were part of this list
+            if moveflag(m) in (KCASTLE,QCASTLE,EPCAPTURE):
+                continue
+            entry=list(movecoords(m))
+            if entry not in movi:
+                movi.append(entry)
         return movi
 
     def checkw(self,gametiles):
-        x=0
-        y=0
-        for m in range(8):
-            for k in range(8):
-                if(gametiles[m][k].pieceonTile.tostring()=='k'):
-                    x=m
-                    y=k
-        for m in range(8):
-            for k in range(8):
-                if(gametiles[m][k].pieceonTile.alliance=='Black'):
-                    moves=gametiles[m][k].pieceonTile.legalmoveb(gametiles)
-                    for move in moves:
-                        if(move[0]==x and move[1]==y):
-                            return["checked",[m,k]]
+        attacker=self.attacker(gametiles,self.kingsquare(gametiles,'k'),'Black')
+        if attacker is not None:
+            return["checked",attacker]
         return["notchecked"]
 
     def movesifcheckedw(self,gametiles):
         movi=[]
-        piece=None
-        for m in range(8):
-            for k in range(8):
-                if(gametiles[m][k].pieceonTile.alliance=='White'):
-                    moves=gametiles[m][k].pieceonTile.legalmoveb(gametiles)
-                    for move in moves:
-                        x=move[0]
-                        y=move[1]
-                        piece=gametiles[x][y].pieceonTile
-                        gametiles[x][y].pieceonTile=gametiles[m][k].pieceonTile
-                        gametiles[m][k].pieceonTile=nullpiece()
-                        s=self.updateposition(x,y)
-                        gametiles[x][y].pieceonTile.position=s
-                        if(self.checkw(gametiles)[0]=='notchecked'):
-                            movi.append([m,k,x,y])
-                        gametiles[m][k].pieceonTile=gametiles[x][y].pieceonTile
-                        gametiles[x][y].pieceonTile=piece
-                        s=self.updateposition(m,k)
-                        gametiles[m][k].pieceonTile.position=s
-
-
+        for m in self.legalmoves(gametiles,'White'):
+            #castling and en passant never were part of this list
+            if moveflag(m) in (KCASTLE,QCASTLE,EPCAPTURE):
+                continue
+            entry=list(movecoords(m))
+            if entry not in movi:
+                movi.append(entry)
         return movi
 
-    def castlingb(self,gametiles):
-        array=[]
-        for m in range(8):
-            for k in range(8):
-                if(gametiles[m][k].pieceonTile.tostring()=='K'):
-                    if(gametiles[m][k].pieceonTile.moved==False):
-                        if(k+3 < 8 and gametiles[m][k+3].pieceonTile.tostring()=='R'):
-                            if(gametiles[m][k+3].pieceonTile.moved==False):
-                                if(gametiles[m][k+1].pieceonTile.tostring()=='-'):
-                                    if(gametiles[m][k+2].pieceonTile.tostring()=='-'):
-                                        array.append('ks')
-                        if(gametiles[m][0].pieceonTile.tostring()=='R'):
-                            if(gametiles[m][0].pieceonTile.moved==False):
-                                if(gametiles[m][3].pieceonTile.tostring()=='-'):
-                                    if(gametiles[m][2].pieceonTile.tostring()=='-'):
-                                        if(gametiles[m][1].pieceonTile.tostring()=='-'):
-                                            array.append('qs')
-                    return array
-    def castlingw(self,gametiles):
+    def castling(self,gametiles,color):
+        #'ks'/'qs' for each side the king of color could castle to going by the moved
+        #flags and the empty squares between; None if that king is not on the board
+        king=makecode(color,KING)
+        rook=makecode(color,ROOK)
+        sq=self.kingsquare(gametiles,CHARS[king])
+        m,k=sq>>3,sq&7
+        row=gametiles[m]
+        if(row[k].pieceonTile.code!=king):
+            return None
         array=[]
-        for m in range(8):
-            for k in range(8):
-                if(gametiles[m][k].pieceonTile.tostring()=='k'):
-                    if(gametiles[m][k].pieceonTile.moved==False):
-                        if(k+3 < 8 and gametiles[m][k+3].pieceonTile.tostring()=='r'):
-                            if(gametiles[m][k+3].pieceonTile.moved==False):
-                                if(gametiles[m][k+1].pieceonTile.tostring()=='-'):
-                                    if(gametiles[m][k+2].pieceonTile.tostring()=='-'):
-                                        array.append('ks')
-                        if(gametiles[m][0].pieceonTile.tostring()=='r'):
-                            if(gametiles[m][0].pieceonTile.moved==False):
-                                if(gametiles[m][3].pieceonTile.tostring()=='-'):
-                                    if(gametiles[m][2].pieceonTile.tostring()=='-'):
-                                        if(gametiles[m][1].pieceonTile.tostring()=='-'):
-                                            array.append('qs')
-                    return array
+        if(row[k].pieceonTile.moved==False):
+            if(k+3 < 8 and row[k+3].pieceonTile.code==rook and row[k+3].pieceonTile.moved==False):
+                if(row[k+1].pieceonTile.code==EMPTY and row[k+2].pieceonTile.code==EMPTY):
+                    array.append('ks')
+            if(row[0].pieceonTile.code==rook and row[0].pieceonTile.moved==False):
+                if(row[3].pieceonTile.code==EMPTY and row[2].pieceonTile.code==EMPTY and row[1].pieceonTile.code==EMPTY):
+                    array.append('qs')
+        return array
 
+    def castlingb(self,gametiles):
+        return self.castling(gametiles,BLACK)
 
+    def castlingw(self,gametiles):
+        return self.castling(gametiles,WHITE)
 
-    def enpassantb(self,gametiles,y,x):
 
-        if(gametiles[y][x].pieceonTile.tostring()=='P' and y==4):
-            if(x+1<8 and gametiles[y][x+1].pieceonTile.tostring()=='p' and gametiles[y][x+1].pieceonTile.enpassant==True):
-                return[[y,x],'r']
-            if(x-1>=0 and gametiles[y][x-1].pieceonTile.tostring()=='p' and gametiles[y][x-1].pieceonTile.enpassant==True):
-                return[[y,x],'l']
 
-        if(gametiles[y][x].pieceonTile.tostring()=='p' and y==3):
-            if(x+1<8 and gametiles[y][x+1].pieceonTile.tostring()=='P' and gametiles[y][x+1].pieceonTile.enpassant==True):
+    def enpassantb(self,gametiles,y,x):
+        #a pawn on its fifth rank next to an enemy pawn that has just made its double step
+        code=gametiles[y][x].pieceonTile.code
+        if((code==makecode(BLACK,PAWN) and y==4) or (code==makecode(WHITE,PAWN) and y==3)):
+            enemy=makecode(code//6^1,PAWN)
+            if(x+1<8 and gametiles[y][x+1].pieceonTile.code==enemy and gametiles[y][x+1].pieceonTile.enpassant==True):
                 return[[y,x],'r']
-            if(x-1>=0 and gametiles[y][x-1].pieceonTile.tostring()=='P' and gametiles[y][x-1].pieceonTile.enpassant==True):
+            if(x-1>=0 and gametiles[y][x-1].pieceonTile.code==enemy and gametiles[y][x-1].pieceonTile.enpassant==True):
                 return[[y,x],'l']
 
         return []
 
 
     def pinnedb(self,gametiles,moves,y,x):
-        movi=[]
-        piece1=None
-        for move in moves:
-            m=move[0]
-            k=move[1]
-            piece1=gametiles[m][k].pieceonTile
-            gametiles[m][k].pieceonTile=gametiles[y][x].pieceonTile
-            gametiles[y][x].pieceonTile=nullpiece()
-            if(self.checkb(gametiles)[0]=='notchecked'):
-                movi.append(move)
-            gametiles[y][x].pieceonTile=gametiles[m][k].pieceonTile
-            gametiles[m][k].pieceonTile=piece1
-
-        return movi
+        return self.legaltargets(gametiles,moves,y,x,'Black')
 
     def pinnedw(self,gametiles,moves,y,x):
-        movi=[]
-        piece1=None
-        for move in moves:
-            m=move[0]
-            k=move[1]
-            piece1=gametiles[m][k].pieceonTile
-            gametiles[m][k].pieceonTile=gametiles[y][x].pieceonTile
-            gametiles[y][x].pieceonTile=nullpiece()
-            if(self.checkw(gametiles)[0]=='notchecked'):
-                movi.append(move)
-            gametiles[y][x].pieceonTile=gametiles[m][k].pieceonTile
-            gametiles[m][k].pieceonTile=piece1
-
-        return movi
+        return self.legaltargets(gametiles,moves,y,x,'White')
@@ -0,0 +1,28 @@
+#zobrist keys: one random 64 bit number per (piece code, square), for black to move,
+#for each of the 16 castling right combinations and for each en passant file
+#a position's key is the xor of the numbers for everything in it, so make/unmake can
+#update it with a few xors; the seed is fixed so keys are the same from run to run
+
+import random
+
+from pieces.codes import EMPTY
+
+generator=random.Random(0x5EED)
+
+PIECEKEYS=[[generator.getrandbits(64) for sq in range(64)] for code in range(12)]+[[0]*64]
+BLACKKEY=generator.getrandbits(64)
+CASTLEKEYS=[generator.getrandbits(64) for rights in range(16)]
+EPKEYS=[generator.getrandbits(64) for col in range(8)]
+
+
+def fullkey(squares,turn,castling,ep):
+    key=0
+    for sq in range(64):
+        if squares[sq]!=EMPTY:
+            key^=PIECEKEYS[squares[sq]][sq]
+    if turn:
+        key^=BLACKKEY
+    key^=CASTLEKEYS[castling]
+    if ep>=0:
+        key^=EPKEYS[ep&7]
+    return key
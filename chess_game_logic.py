@@ -5,6 +5,8 @@ import math
 from board.chessboard import board
 from board.tile import Tile
 from board.move import move
+from board.bitboard import bitboard, movefrom, moveto, movecoords, promotionpiece, squarename, findmove, DOUBLE, KCASTLE, QCASTLE, CAPTURE, EPCAPTURE, PROMOTION
+from board.mailbox import mailbox
 from pieces.nullpiece import nullpiece
 from pieces.queen import queen
 from pieces.rook import rook
@@ -12,18 +14,22 @@ from pieces.knight import knight
 from pieces.bishop import bishop
 from pieces.king import king
 from pieces.pawn import pawn
-from player.AI import AI
+from player.AI import AI, budget
+from player.book import openingbook
+from pieces.codes import WHITE, BLACK, PAWN, KNIGHT, BISHOP, ROOK, KING, EMPTY, makecode
 
 class ChessGame:
     """
     Encapsulates all the core chess game logic, board state, and rules.
     This class should be completely independent of any UI (Pygame, web, etc.).
     """
-    def __init__(self):
+    def __init__(self, book=None):
         self.board = board()
         self.board.createboard()
         self.move_validator = move() # Your existing move validation logic
+        self.position = bitboard() # Bitboard mirror of the tiles, used for move generation and search
         self.ai_player = AI() # Your existing AI
+        self.book = openingbook(book) if book else None # Optional Polyglot .bin opening book, consulted before searching
 
         self.turn = 0 # 0 for White, 1 for Black, increments with each move
         self.enpassant_target_square = [] # [row, col] of pawn that can be captured en passant
@@ -40,6 +46,7 @@ class ChessGame:
         self.puzzle_mode = False
         self.puzzle_moves_limit = 0
         self.moves_made_count = 0
+        self._sync_position()
 
     def reset_game(self):
         """Resets the game to its initial state."""
@@ -58,6 +65,7 @@ class ChessGame:
         self.puzzle_mode = False
         self.puzzle_moves_limit = 0
         self.moves_made_count = 0
+        self._sync_position()
 
     def save_state(self):
         """Returns a serializable dictionary of the current game state."""
@@ -74,7 +82,9 @@ class ChessGame:
             'puzzle_mode': self.puzzle_mode,
             'puzzle_moves_limit': self.puzzle_moves_limit,
             'moves_made_count': self.moves_made_count,
-            'game_over_status': self.game_over_status
+            'game_over_status': self.game_over_status,
+            'promotion_pending': self.promotion_pending,
+            'promotion_details': self.promotion_details
         }
         return state
 
@@ -93,13 +103,20 @@ class ChessGame:
         self.puzzle_moves_limit = state.get('puzzle_moves_limit', 0)
         self.moves_made_count = state.get('moves_made_count', 0)
         self.game_over_status = state.get('game_over_status', None)
+        # A promotion pending in this game does not carry over; the loaded one may have its own
+        self.promotion_pending = state.get('promotion_pending', False)
+        self.promotion_details = state.get('promotion_details', {})
+        self._sync_position()
+
+    def _sync_position(self):
+        """Rebuilds the bitboard position from the tiles (castling and en passant come from the piece flags)."""
+        self.position.loadtiles(self.board.gameTiles, WHITE if self.turn % 2 == 0 else BLACK)
 
     def get_current_player_alliance(self):
         return 'White' if self.turn % 2 == 0 else 'Black'
 
     def get_notation(self, row, col):
-        files = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h']
-        return f"{files[col]}{8-row}"
+        return squarename(self._update_pos(row, col))
 
     def get_legal_moves_for_piece(self, row, col):
         """
@@ -107,62 +124,53 @@ class ChessGame:
         considering checks and pins.
         """
         piece = self.board.gameTiles[row][col].pieceonTile
-        if piece.tostring() == '-':
+        if piece.code == EMPTY:
             return []
 
-        moves = piece.legalmoveb(self.board.gameTiles) # Base moves
-
-        # Add special moves (castling, en passant)
-        if piece.tostring() == 'K' and piece.alliance == 'White':
-            castling_moves = self.move_validator.castlingb(self.board.gameTiles) # Your castling logic
-            if 'ks' in castling_moves: moves.append([0, 6])
-            if 'qs' in castling_moves: moves.append([0, 2])
-        elif piece.tostring() == 'k' and piece.alliance == 'Black':
-            castling_moves = self.move_validator.castlingw(self.board.gameTiles) # Your castling logic
-            if 'ks' in castling_moves: moves.append([7, 6])
-            if 'qs' in castling_moves: moves.append([7, 2])
-
-        if piece.tostring() == 'P' and piece.alliance == 'White':
-            enpassant_moves = self.move_validator.enpassantb(self.board.gameTiles, row, col)
-            if enpassant_moves:
-                if enpassant_moves[1] == 'r': moves.append([row + 1, col + 1])
-                else: moves.append([row + 1, col - 1])
-        elif piece.tostring() == 'p' and piece.alliance == 'Black':
-            enpassant_moves = self.move_validator.enpassantb(self.board.gameTiles, row, col)
-            if enpassant_moves:
-                if enpassant_moves[1] == 'r': moves.append([row - 1, col + 1])
-                else: moves.append([row - 1, col - 1])
-
-        # Filter moves based on checks and pins
-        if piece.alliance == 'White':
-            moves = self.move_validator.pinnedw(self.board.gameTiles, moves, row, col)
-        else: # Black
-            moves = self.move_validator.pinnedb(self.board.gameTiles, moves, row, col)
-
         # Ensure only current player's pieces can be moved
-        if (self.turn % 2 == 0 and piece.alliance == 'Black') or \
-           (self.turn % 2 == 1 and piece.alliance == 'White'):
+        if piece.color != self.turn % 2:
             return []
 
+        # The bitboard generator already covers castling, en passant, checks and pins
+        square = self._update_pos(row, col)
+        moves = []
+        for legal in self.position.legalmoves():
+            if movefrom(legal) == square:
+                target = list(divmod(moveto(legal), 8))
+                if target not in moves:
+                    moves.append(target)
         return moves
 
+    def _snapshot(self):
+        """Compact copy of the current position for the undo history (one bytearray instead of 64 deep-copied tiles)."""
+        snapshot = mailbox()
+        snapshot.loadposition(self.position)
+        return snapshot
+
+    def _find_move(self, start_row, start_col, end_row, end_col, promotion_kind=None):
+        """Returns the encoded bitboard move for the given squares if it is legal, or None."""
+        return findmove(self.position.legalmoves(), self._update_pos(start_row, start_col),
+                        self._update_pos(end_row, end_col), promotion_kind)
+
     def apply_move(self, start_row, start_col, end_row, end_col):
         """
         Applies a move to the board and updates game state.
         Returns True if move was successful, False otherwise.
         """
         piece = self.board.gameTiles[start_row][start_col].pieceonTile
-        if piece.tostring() == '-':
+        if piece.code == EMPTY:
             return False # No piece to move
 
-        # Check if the move is legal
-        legal_moves = self.get_legal_moves_for_piece(start_row, start_col)
-        if [end_row, end_col] not in legal_moves:
+        # Only a side's own pieces have legal moves, so this also checks whose turn it is.
+        # A pawn reaching the last rank is played as a queen promotion until promote_pawn
+        encoded = self._find_move(start_row, start_col, end_row, end_col)
+        if encoded is None:
             return False
+        flag = encoded >> 12
 
         # Store current state for undo
         self.history.append((
-            copy.deepcopy(self.board.gameTiles),
+            self._snapshot(),
             self.turn,
             self.white_time,
             self.black_time,
@@ -171,21 +179,14 @@ class ChessGame:
             copy.deepcopy(self.move_log)
         ))
 
-        is_capture = (self.board.gameTiles[end_row][end_col].pieceonTile.tostring() != '-')
+        is_capture = bool(flag & CAPTURE)
 
         # Handle special moves and update piece properties
-        if piece.tostring() in ['K', 'R', 'k', 'r']:
+        if piece.kind == KING or piece.kind == ROOK:
             piece.moved = True
 
         # Castling
-        if piece.tostring() == 'K' and abs(start_col - end_col) == 2: # White King castling
-            rook_col = 7 if end_col == 6 else 0
-            new_rook_col = 5 if end_col == 6 else 3
-            rook_piece = self.board.gameTiles[start_row][rook_col].pieceonTile
-            self.board.gameTiles[start_row][new_rook_col] = Tile(self._update_pos(start_row, new_rook_col), rook_piece)
-            self.board.gameTiles[start_row][rook_col] = Tile(self._update_pos(start_row, rook_col), nullpiece())
-            rook_piece.position = self._update_pos(start_row, new_rook_col)
-        elif piece.tostring() == 'k' and abs(start_col - end_col) == 2: # Black King castling
+        if flag == KCASTLE or flag == QCASTLE:
             rook_col = 7 if end_col == 6 else 0
             new_rook_col = 5 if end_col == 6 else 3
             rook_piece = self.board.gameTiles[start_row][rook_col].pieceonTile
@@ -193,25 +194,19 @@ class ChessGame:
             self.board.gameTiles[start_row][rook_col] = Tile(self._update_pos(start_row, rook_col), nullpiece())
             rook_piece.position = self._update_pos(start_row, new_rook_col)
 
-        # En Passant Capture
-        if piece.tostring() in ['P', 'p'] and end_col != start_col and \
-           self.board.gameTiles[end_row][end_col].pieceonTile.tostring() == '-':
-            # This is an en passant capture
-            is_capture = True
-            if piece.alliance == 'White':
-                self.board.gameTiles[end_row + 1][end_col] = Tile(self._update_pos(end_row + 1, end_col), nullpiece())
-            else:
-                self.board.gameTiles[end_row - 1][end_col] = Tile(self._update_pos(end_row - 1, end_col), nullpiece())
+        # En Passant Capture: the captured pawn stands beside the start square
+        if flag == EPCAPTURE:
+            self.board.gameTiles[start_row][end_col] = Tile(self._update_pos(start_row, end_col), nullpiece())
 
         # Clear previous en passant target
         if self.enpassant_target_square:
             pawn_tile = self.board.gameTiles[self.enpassant_target_square[0]][self.enpassant_target_square[1]].pieceonTile
-            if pawn_tile.tostring() in ['P', 'p']:
+            if pawn_tile.kind == PAWN:
                 pawn_tile.enpassant = False
         self.enpassant_target_square = []
 
         # Set new en passant target if pawn moves two squares
-        if piece.tostring() in ['P', 'p'] and abs(start_row - end_row) == 2:
+        if flag == DOUBLE:
             piece.enpassant = True
             self.enpassant_target_square = [end_row, end_col]
 
@@ -221,19 +216,22 @@ class ChessGame:
         piece.position = self._update_pos(end_row, end_col)
 
         # Check for Pawn Promotion
-        if (piece.tostring() == 'P' and end_row == 7) or \
-           (piece.tostring() == 'p' and end_row == 0):
+        if flag & PROMOTION:
             self.promotion_pending = True
             self.promotion_details = {'row': end_row, 'col': end_col, 'alliance': piece.alliance}
         else:
             self.promotion_pending = False
 
+        self.position.make(encoded)
+
         self.last_move = [[start_row, start_col], [end_row, end_col]]
         self.move_log.append(f"{self.get_notation(start_row, start_col)} to {self.get_notation(end_row, end_col)}")
         self.turn += 1
         self.moves_made_count += 1
 
-        self.check_game_over() # Update game over status after each move
+        # A pending promotion is still a provisional queen on the bitboard; promote_pawn checks once the piece is known
+        if not self.promotion_pending:
+            self.check_game_over() # Update game over status after each move
         return True, is_capture
 
     def promote_pawn(self, row, col, piece_type_char):
@@ -254,6 +252,15 @@ class ChessGame:
 
         if new_piece:
             self.board.gameTiles[row][col].pieceonTile = new_piece
+            if self.position.history:
+                # The bitboard played the pawn move as a queen promotion; replay it with the chosen piece
+                promoted = self.position.history[-1][0]
+                self.position.unmake()
+                start_row, start_col, _, _ = movecoords(promoted)
+                self.position.make(self._find_move(start_row, start_col, row, col, new_piece.kind))
+            else:
+                # A loaded game has no bitboard history to replay; rebuild it from the tiles
+                self._sync_position()
             self.promotion_pending = False
             self.promotion_details = {}
             self.check_game_over() # Re-check game over status after promotion
@@ -264,7 +271,11 @@ class ChessGame:
         """Undoes the last move made."""
         if self.history:
             state = self.history.pop()
-            self.board.gameTiles = copy.deepcopy(state[0])
+            # Older saves hold deep-copied tiles, newer ones a mailbox snapshot
+            if isinstance(state[0], mailbox):
+                self.board.gameTiles = state[0].totiles()
+            else:
+                self.board.gameTiles = copy.deepcopy(state[0])
             self.turn = state[1]
             self.white_time = state[2]
             self.black_time = state[3]
@@ -275,14 +286,33 @@ class ChessGame:
             self.promotion_details = {}
             self.game_over_status = None # Clear game over status on undo
             self.moves_made_count -= 1
+            # The bitboard takes its own move back, which also restores its zobrist key;
+            # a game loaded from a save has no bitboard history yet and is rebuilt from the tiles
+            if self.position.history:
+                self.position.unmake()
+            else:
+                self._sync_position()
             return True
         return False
 
-    def get_ai_move(self, is_white_turn, depth=None):
-        """Calculates the best AI move."""
+    def get_ai_move(self, is_white_turn, depth=None, movetime=None):
+        """
+        Calculates the best AI move. While the position is in the opening book a book move
+        is played, picked by its weight, without searching. Otherwise the search deepens up to
+        the AI depth and stops early once its share of the side's remaining clock
+        (player.AI.budget) is used up.
+        Returns (start_row, start_col, end_row, end_col, promotion), promotion being the piece
+        letter to pass to promote_pawn ('Q', 'R', 'N' or 'B') or None.
+        """
+        if self.book is not None:
+            book_move = self.book.choose(self.position)
+            if book_move:
+                return movecoords(book_move) + (promotionpiece(book_move),)
         current_depth = depth if depth is not None else self.ai_depth
-        # AI evaluate returns (start_row, start_col, end_row, end_col)
-        return self.ai_player.evaluate(copy.deepcopy(self.board.gameTiles), current_depth, is_white_turn)
+        if movetime is None:
+            movetime = budget(self.white_time if is_white_turn else self.black_time)
+        # AI evaluate returns (start_row, start_col, end_row, end_col, promotion)
+        return self.ai_player.evaluate(self.position.copy(), current_depth, is_white_turn, movetime)
 
     def check_game_over(self):
         """
@@ -292,53 +322,33 @@ class ChessGame:
         if self.game_over_status: # Already game over
             return self.game_over_status
 
-        current_player_alliance = self.get_current_player_alliance()
-        opponent_alliance = 'Black' if current_player_alliance == 'White' else 'White'
-
         # Check for checkmate/stalemate
-        all_legal_moves = []
-        for r in range(8):
-            for c in range(8):
-                piece = self.board.gameTiles[r][c].pieceonTile
-                if piece.alliance == current_player_alliance:
-                    all_legal_moves.extend(self.get_legal_moves_for_piece(r, c))
-
-        if not all_legal_moves: # No legal moves
-            if current_player_alliance == 'White':
-                if self.move_validator.checkw(self.board.gameTiles)[0] == 'checked':
-                    self.game_over_status = 'black_wins' # White is checkmated
-                else:
-                    self.game_over_status = 'draw' # White is stalemated
-            else: # Black's turn
-                if self.move_validator.checkb(self.board.gameTiles)[0] == 'checked':
-                    self.game_over_status = 'white_wins' # Black is checkmated
-                else:
-                    self.game_over_status = 'draw' # Black is stalemated
+        if not self.position.legalmoves(): # No legal moves
+            if self.position.incheck():
+                # The side to move is checkmated
+                self.game_over_status = 'black_wins' if self.position.turn == WHITE else 'white_wins'
+            else:
+                self.game_over_status = 'draw' # Stalemate
 
         # Check for insufficient material (simplified)
-        if self._check_insufficient_material(self.board.gameTiles):
+        if self._check_insufficient_material():
             self.game_over_status = 'draw'
 
         return self.game_over_status
 
-    def _check_insufficient_material(self, gametiles):
+    def _check_insufficient_material(self):
         """A simplified check for insufficient material (e.g., K vs K, K vs KN, K vs KB)."""
-        piece_counts = {'K': 0, 'Q': 0, 'R': 0, 'B': 0, 'N': 0, 'P': 0,
-                        'k': 0, 'q': 0, 'r': 0, 'b': 0, 'n': 0, 'p': 0}
-        for r in range(8):
-            for c in range(8):
-                piece_char = gametiles[r][c].pieceonTile.tostring()
-                if piece_char != '-':
-                    piece_counts[piece_char] += 1
+        # The bitboard keeps one square set per piece code, so this counts bits instead of scanning tiles
+        piece_counts = [bin(squares).count('1') for squares in self.position.pieces]
 
-        total_pieces = sum(piece_counts.values())
+        total_pieces = sum(piece_counts)
 
         if total_pieces == 2: # King vs King
             return True
         if total_pieces == 3: # King vs King and one minor piece
-            if (piece_counts['N'] == 1 or piece_counts['B'] == 1 or
-                piece_counts['n'] == 1 or piece_counts['b'] == 1):
-                return True
+            for color in (WHITE, BLACK):
+                if piece_counts[makecode(color, KNIGHT)] == 1 or piece_counts[makecode(color, BISHOP)] == 1:
+                    return True
         # More complex insufficient material checks can be added here
         return False
 
@@ -371,6 +381,7 @@ class ChessGame:
             self.turn = 0 # White to move
 
         # You'll need to add more puzzles here
+        self._sync_position()
 
     def get_board_state_for_display(self):
         """Returns the current board state in a format suitable for UI rendering."""
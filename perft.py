@@ -0,0 +1,153 @@
+#perft: counts the leaf nodes of the legal move tree and compares them with the
+#published numbers for a set of standard positions
+#run: python perft.py [--depth N] [--board bitboard|mailbox|tiles] [--divide] [fen]
+
+import argparse
+import sys
+import time
+
+from board.bitboard import bitboard, movefrom, moveto, squarename, movename
+from board.mailbox import mailbox
+from board.move import move
+from pieces.codes import WHITE, ALLIANCES
+
+#name, fen, expected node counts for depth 1,2,3...
+FIXTURES=(
+    ("start","rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+     (20,400,8902,197281,4865609)),
+    ("kiwipete","r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+     (48,2039,97862,4085603)),
+    ("enpassant","8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+     (14,191,2812,43238,674624)),
+    ("castling-promotion","r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+     (6,264,9467,422333)),
+    ("promotion","n1n5/PPPk4/8/8/8/8/4Kppp/5N1N b - - 0 1",
+     (24,496,9483,182838,3605103)),
+    ("middlegame","rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+     (44,1486,62379,2103487)),
+)
+
+
+class tiles:
+    #the tile move generator the pygame UI uses (legalmoveb, castling*, enpassant*,
+    #pinned*) asked for its moves at every node; the moves are then played on a
+    #bitboard underneath, so any move the tiles offer that the bitboard does not know
+    #(or the other way round) is reported
+
+    def __init__(self,position):
+        self.position=position
+        self.movex=move()
+
+    def make(self,m):
+        self.position.make(m)
+
+    def unmake(self):
+        self.position.unmake()
+
+    def legalmoves(self):
+        position=self.position
+        gametiles=position.totiles()
+        alliance=ALLIANCES[position.turn]
+        movex=self.movex
+        home=7 if position.turn==WHITE else 0
+        offered=set()
+        for y in range(8):
+            for x in range(8):
+                piece=gametiles[y][x].pieceonTile
+                if piece.alliance!=alliance:
+                    continue
+                targets=piece.legalmoveb(gametiles)
+                kind=piece.tostring().lower()
+                if kind=='k' and [y,x]==[home,4]:
+                    for side in (movex.castlingw(gametiles) if alliance=='White' else movex.castlingb(gametiles)) or []:
+                        targets.append([home,6] if side=='ks' else [home,2])
+                if kind=='p':
+                    ep=movex.enpassantb(gametiles,y,x)
+                    if ep:
+                        targets.append([y+(-1 if alliance=='White' else 1),x+(1 if ep[1]=='r' else -1)])
+                pinned=movex.pinnedw if alliance=='White' else movex.pinnedb
+                for a,b in pinned(gametiles,targets,y,x):
+                    offered.add((y*8+x,a*8+b))
+        moves=[]
+        known=set()
+        for m in position.legalmoves():
+            known.add((movefrom(m),moveto(m)))
+            if (movefrom(m),moveto(m)) in offered:
+                moves.append(m)
+        if offered!=known:
+            raise AssertionError("tile moves differ: extra %s missing %s" % (
+                sorted(squarename(a)+squarename(b) for a,b in offered-known),
+                sorted(squarename(a)+squarename(b) for a,b in known-offered)))
+        return moves
+
+
+def makeboard(fen,kind='bitboard'):
+    position=bitboard()
+    position.loadfen(fen)
+    if kind=='mailbox':
+        compact=mailbox()
+        compact.loadposition(position)
+        return compact
+    if kind=='tiles':
+        return tiles(position)
+    return position
+
+
+def perft(board,depth):
+    moves=board.legalmoves()
+    if depth<=1:
+        return len(moves) if depth==1 else 1
+    nodes=0
+    for m in moves:
+        board.make(m)
+        nodes+=perft(board,depth-1)
+        board.unmake()
+    return nodes
+
+
+def divide(board,depth):
+    #node count below every root move, for finding where two generators disagree
+    total=0
+    for m in board.legalmoves():
+        board.make(m)
+        nodes=perft(board,depth-1)
+        board.unmake()
+        print(f"{movename(m)}: {nodes}")
+        total+=nodes
+    print(f"total: {total}")
+    return total
+
+
+def run(maxdepth,kind):
+    failed=0
+    for name,fen,expected in FIXTURES:
+        board=makeboard(fen,kind)
+        for depth in range(1,min(maxdepth,len(expected))+1):
+            start=time.perf_counter()
+            nodes=perft(board,depth)
+            seconds=time.perf_counter()-start
+            ok=nodes==expected[depth-1]
+            failed+=not ok
+            print(f"{name:<20}depth {depth}{nodes:>10}{'' if ok else '  expected %d' % expected[depth-1]:>20}"
+                  f"{seconds:9.2f}s{nodes/max(seconds,1e-9):>10.0f} nps  {'ok' if ok else 'FAIL'}")
+    return failed
+
+
+if __name__=='__main__':
+    parser=argparse.ArgumentParser(description="perft node counts for the move generators")
+    parser.add_argument('fen',nargs='?',help="position to divide instead of the fixture set")
+    parser.add_argument('--depth',type=int,default=4)
+    parser.add_argument('--board',choices=('bitboard','mailbox','tiles'),default='bitboard')
+    parser.add_argument('--divide',action='store_true',help="print the count below every root move")
+    args=parser.parse_args()
+    if args.fen or args.divide:
+        board=makeboard(args.fen or FIXTURES[0][1],args.board)
+        if args.divide:
+            divide(board,args.depth)
+        else:
+            start=time.perf_counter()
+            nodes=perft(board,args.depth)
+            seconds=time.perf_counter()-start
+            print(f"{nodes} nodes {seconds:.2f}s {nodes/max(seconds,1e-9):.0f} nps")
+    else:
+        sys.exit(1 if run(args.depth,args.board) else 0)
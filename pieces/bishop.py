@@ -1,191 +1,27 @@
 from pieces.piece import piece
-import math
+from pieces.codes import BISHOP, EMPTY
+from board.attacks import BISHOP_RAYS
 
 class bishop(piece):
 
-    alliance = None
-    position= None
-
-    def __init__(self, alliance,position):
-        self.alliance=alliance
-        self.position=position
-
+    __slots__=()
+    kind=BISHOP
 
     def tostring(self):
         return 'B' if self.alliance == "Black" else "b"
 
-    def calculatecoordinates(self):
-        a=self.position/8
-        b=self.position%8
-        return[math.floor(a),b]
-
-
     def legalmoveb(self,gametiles):
         legalmoves=[]
-        x=self.calculatecoordinates()[0]
-        y=self.calculatecoordinates()[1]
-        a=0
-        b=0
-        count=0
-        if(gametiles[x][y].pieceonTile.alliance=='Black'):
-            while True:
-                if(count==0):
-                    a=x+1
-                    b=y+1
-                    count=count+1
-                else:
-                    a=a+1
-                    b=b+1
-                if(a<8 and b<8 and gametiles[a][b].pieceonTile.alliance is None):
+        color=self.code//6
+        for ray in BISHOP_RAYS[self.position]:
+            for move in ray:
+                a=move>>3
+                b=move&7
+                other=gametiles[a][b].pieceonTile.code
+                if other==EMPTY:
                     legalmoves.append([a,b])
                     continue
-                elif(a<8 and b<8 and gametiles[a][b].pieceonTile.alliance=='White'):
-                    legalmoves.append([a,b])
-                    break
-                else:
-                    break
-
-
-
-            count=0
-            while True:
-
-                if(count==0):
-                    a=x-1
-                    b=y-1
-                    count=count+1
-                else:
-                    a=a-1
-                    b=b-1
-                if(a>=0 and b>=0 and gametiles[a][b].pieceonTile.alliance is None):
-                    legalmoves.append([a,b])
-                    continue
-                elif(a>=0 and b>=0 and gametiles[a][b].pieceonTile.alliance=='White'):
-                    legalmoves.append([a,b])
-                    break
-                else:
-                    break
-
-            count=0
-            while True:
-                if(count==0):
-                    a=x+1
-                    b=y-1
-                    count=count+1
-                else:
-                    a=a+1
-                    b=b-1
-                if(a<8 and b>=0 and gametiles[a][b].pieceonTile.alliance is None):
+                if other//6!=color:
                     legalmoves.append([a,b])
-                    continue
-                elif(a<8 and b>=0 and gametiles[a][b].pieceonTile.alliance=='White'):
-                    legalmoves.append([a,b])
-                    break
-                else:
-                    break
-
-            count=0
-            while True:
-                if(count==0):
-                    a=x-1
-                    b=y+1
-                    count=count+1
-                else:
-                    a=a-1
-                    b=b+1
-                if(a>=0 and b<8 and gametiles[a][b].pieceonTile.alliance is None):
-                    legalmoves.append([a,b])
-                    continue
-                elif(a>=0 and b<8 and gametiles[a][b].pieceonTile.alliance=='White'):
-                    legalmoves.append([a,b])
-                    break
-                else:
-                    break
-
-            return legalmoves
-
-        if(gametiles[x][y].pieceonTile.alliance=='White'):
-            while True:
-                if(count==0):
-                    a=x+1
-                    b=y+1
-                    count=count+1
-                else:
-                    a=a+1
-                    b=b+1
-                if(a<8 and b<8 and gametiles[a][b].pieceonTile.alliance is None):
-                    legalmoves.append([a,b])
-                    continue
-                elif(a<8 and b<8 and gametiles[a][b].pieceonTile.alliance=='Black'):
-                    legalmoves.append([a,b])
-                    break
-                else:
-                    break
-
-
-
-            count=0
-            while True:
-
-                if(count==0):
-                    a=x-1
-                    b=y-1
-                    count=count+1
-                else:
-                    a=a-1
-                    b=b-1
-                if(a>=0 and b>=0 and gametiles[a][b].pieceonTile.alliance is None):
-                    legalmoves.append([a,b])
-                    continue
-                elif(a>=0 and b>=0 and gametiles[a][b].pieceonTile.alliance=='Black'):
-                    legalmoves.append([a,b])
-                    break
-                else:
-                    break
-
-            count=0
-            while True:
-                if(count==0):
-                    a=x+1
-                    b=y-1
-                    count=count+1
-                else:
-                    a=a+1
-                    b=b-1
-                if(a<8 and b>=0 and gametiles[a][b].pieceonTile.alliance is None):
-                    legalmoves.append([a,b])
-                    continue
-                elif(a<8 and b>=0 and gametiles[a][b].pieceonTile.alliance=='Black'):
-                    legalmoves.append([a,b])
-                    break
-                else:
-                    break
-
-            count=0
-            while True:
-                if(count==0):
-                    a=x-1
-                    b=y+1
-                    count=count+1
-                else:
-                    a=a-1
-                    b=b+1
-                if(a>=0 and b<8 and gametiles[a][b].pieceonTile.alliance is None):
-                    legalmoves.append([a,b])
-                    continue
-                elif(a>=0 and b<8 and gametiles[a][b].pieceonTile.alliance=='Black'):
-                    legalmoves.append([a,b])
-                    break
-                else:
-                    break
-
-            return legalmoves
-
-
-
-
-
-
-
-
-
+                break
+        return legalmoves
@@ -0,0 +1,32 @@
+#integer piece and colour codes shared by the compact boards and the engine
+#white pieces print in lowercase and sit on rows 6-7, black in uppercase on rows 0-1
+
+WHITE=0
+BLACK=1
+
+PAWN=0
+KNIGHT=1
+BISHOP=2
+ROOK=3
+QUEEN=4
+KING=5
+
+EMPTY=12
+OFFBOARD=13
+#colorof(EMPTY): the colour of an empty square, neither side's
+NOCOLOR=2
+
+CHARS='pnbrqkPNBRQK-'
+ALLIANCES=('White','Black')
+CODES={c:i for i,c in enumerate(CHARS)}
+ALLIANCECODES={'White':WHITE,'Black':BLACK}
+
+
+def makecode(color,kind):
+    return color*6+kind
+
+def colorof(code):
+    return code//6
+
+def kindof(code):
+    return code%6
@@ -1,11 +1,35 @@
 from pieces.piece import piece
+from pieces.codes import EMPTY
 
 
 class nullpiece(piece):
-    alliance = None
+
+    #every empty square shares one instance: nullpiece() and copies of it hand it back
+    __slots__=()
+    instance=None
+
+    def __new__(cls):
+        if cls.instance is None:
+            empty=object.__new__(cls)
+            empty.alliance=None
+            empty.position=None
+            empty.moved=False
+            empty.enpassant=False
+            empty.code=EMPTY
+            cls.instance=empty
+        return cls.instance
+
     def __init__(self):
         pass
 
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self,memo):
+        return self
+
+    def __reduce__(self):
+        return (nullpiece,())
+
     def tostring(self):
         return "-"
-
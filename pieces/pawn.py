@@ -1,114 +1,33 @@
 from pieces.piece import piece
-import math
+from pieces.codes import PAWN, WHITE, BLACK, EMPTY
+from board.attacks import PAWN_SQUARES
 
 class pawn(piece):
 
-    alliance = None
-    position= None
-    enpassant=False
-
-    def __init__(self,alliance,position):
-        self.alliance=alliance
-        self.position=position
-
+    __slots__=()
+    kind=PAWN
 
     def tostring(self):
         return 'P' if self.alliance == "Black" else "p"
 
-    def calculatecoordinates(self):
-        a=self.position/8
-        b=self.position%8
-        return[math.floor(a),b]
-
-
     def legalmoveb(self,gametiles):
         legalmoves=[]
-        x=self.calculatecoordinates()[0]
-        y=self.calculatecoordinates()[1]
-        if(gametiles[x][y].pieceonTile.alliance=='Black'):
-
-            if(x==1):
-                if(gametiles[x+1][y].pieceonTile.tostring()=='-' ):
-                    legalmoves.append([x+1,y])
-                    if(gametiles[x+2][y].pieceonTile.tostring()=='-'):
-                        legalmoves.append([x+2,y])
-                if(y+1>7):
-                    if(gametiles[x+1][y-1].pieceonTile.alliance=='White'):
-                        legalmoves.append([x+1,y-1])
-                if(y-1<0):
-                    if(gametiles[x+1][y+1].pieceonTile.alliance=='White'):
-                        legalmoves.append([x+1,y+1])
-                if(y+1<8 and y-1>=0):
-                    if(gametiles[x+1][y-1].pieceonTile.alliance=='White'):
-                        legalmoves.append([x+1,y-1])
-                    if(gametiles[x+1][y+1].pieceonTile.alliance=='White'):
-                        legalmoves.append([x+1,y+1])
-                return legalmoves
-
-
-
-            else:
-                if(gametiles[x+1][y].pieceonTile.tostring()=='-'  ):
-                    legalmoves.append([x+1,y])
-                if(y+1>7):
-                    if(gametiles[x+1][y-1].pieceonTile.alliance=='White'):
-                        legalmoves.append([x+1,y-1])
-                if(y-1<0):
-                    if(gametiles[x+1][y+1].pieceonTile.alliance=='White'):
-                        legalmoves.append([x+1,y+1])
-                if(y+1<8 and y-1>=0):
-                    if(gametiles[x+1][y-1].pieceonTile.alliance=='White'):
-                        legalmoves.append([x+1,y-1])
-                    if(gametiles[x+1][y+1].pieceonTile.alliance=='White'):
-                        legalmoves.append([x+1,y+1])
-
-                return legalmoves
-
-
-        if(gametiles[x][y].pieceonTile.alliance=='White'):
-
-            if(x==6):
-                if(gametiles[x-1][y].pieceonTile.tostring()=='-' ):
-                    legalmoves.append([x-1,y])
-                    if(gametiles[x-2][y].pieceonTile.tostring()=='-'):
-                        legalmoves.append([x-2,y])
-                if(y+1>7):
-                    if(gametiles[x-1][y-1].pieceonTile.alliance=='Black'):
-                        legalmoves.append([x-1,y-1])
-                if(y-1<0):
-                    if(gametiles[x-1][y+1].pieceonTile.alliance=='Black'):
-                        legalmoves.append([x-1,y+1])
-                if(y+1<8 and y-1>=0):
-                    if(gametiles[x-1][y-1].pieceonTile.alliance=='Black'):
-                        legalmoves.append([x-1,y-1])
-                    if(gametiles[x-1][y+1].pieceonTile.alliance=='Black'):
-                        legalmoves.append([x-1,y+1])
-                return legalmoves
-
-
-
-            else:
-                if(gametiles[x-1][y].pieceonTile.tostring()=='-'  ):
-                    legalmoves.append([x-1,y])
-                if(y+1>7):
-                    if(gametiles[x-1][y-1].pieceonTile.alliance=='Black'):
-                        legalmoves.append([x-1,y-1])
-                if(y-1<0):
-                    if(gametiles[x-1][y+1].pieceonTile.alliance=='Black'):
-                        legalmoves.append([x-1,y+1])
-                if(y+1<8 and y-1>=0):
-                    if(gametiles[x-1][y-1].pieceonTile.alliance=='Black'):
-                        legalmoves.append([x-1,y-1])
-                    if(gametiles[x-1][y+1].pieceonTile.alliance=='Black'):
-                        legalmoves.append([x-1,y+1])
-
-                return legalmoves
-
-
-
-
-
-
-
-
-
+        x,y=self.calculatecoordinates()
+        color=self.code//6
+        if(color==BLACK):
+            step,start=1,1
+        elif(color==WHITE):
+            step,start=-1,6
+        else:
+            return legalmoves
+
+        if(0<=x+step<8 and gametiles[x+step][y].pieceonTile.code==EMPTY):
+            legalmoves.append([x+step,y])
+            if(x==start and gametiles[x+2*step][y].pieceonTile.code==EMPTY):
+                legalmoves.append([x+2*step,y])
+        for move in PAWN_SQUARES[color][self.position]:
+            a=move>>3
+            b=move&7
+            if(gametiles[a][b].pieceonTile.code//6==color^1):
+                legalmoves.append([a,b])
+        return legalmoves
@@ -1,7 +1,51 @@
+from pieces.codes import ALLIANCECODES, EMPTY, makecode
+
+
 class piece:
 
-    def __intit__(self):
-        pass
+    #fixed attribute set: no per-instance __dict__ and cheaper attribute access
+    __slots__=('alliance','position','moved','enpassant','code')
+    kind=None
+
+    def __init__(self,alliance,position):
+        self.alliance=alliance
+        self.position=position
+        self.moved=False
+        self.enpassant=False
+        self.code=makecode(ALLIANCECODES[alliance],self.kind)
+
+    def __deepcopy__(self,memo):
+        #plain values only, so copy the slots directly instead of going through __reduce_ex__
+        other=object.__new__(type(self))
+        other.alliance=self.alliance
+        other.position=self.position
+        other.moved=self.moved
+        other.enpassant=self.enpassant
+        other.code=self.code
+        return other
 
+    def __setstate__(self,state):
+        #older saves pickled the pieces with a plain __dict__ holding only what was set
+        self.moved=False
+        self.enpassant=False
+        if isinstance(state,tuple):
+            state,slots=state
+            state=dict(state or {},**(slots or {}))
+        for name,value in (state or {}).items():
+            setattr(self,name,value)
+        if not hasattr(self,'alliance'):
+            self.alliance=None
+        if not hasattr(self,'position'):
+            self.position=None
+        if self.alliance is None:
+            self.code=EMPTY
+        else:
+            self.code=makecode(ALLIANCECODES[self.alliance],self.kind)
 
+    @property
+    def color(self):
+        #WHITE or BLACK, NOCOLOR for the empty square
+        return self.code//6
 
+    def calculatecoordinates(self):
+        return [self.position>>3,self.position&7]
@@ -0,0 +1,85 @@
+#material and piece-square values used by the AI evaluation
+#the tables are written from white's side (white moves towards row 0); black reads
+#them upside down and counts negative, so a score is always from white's side
+
+from pieces.codes import PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, EMPTY
+
+PAWNTABLE = [
+    [ 0,  0,  0,  0,  0,  0,  0,  0],
+    [ 50, 50, 50, 50, 50, 50, 50, 50],
+    [ 10, 10, 20, 30, 30, 20, 10, 10],
+    [ 5,  5, 10, 25, 25, 10,  5,  5],
+    [ 0,  0,  0, 20, 20,  0,  0,  0],
+    [ 5, -5,-10,  0,  0,-10, -5,  5],
+    [ 5, 10, 10,-20,-20, 10, 10,  5],
+    [ 0,  0,  0,  0,  0,  0,  0,  0]
+]
+KNIGHTTABLE = [
+    [-50,-40,-30,-30,-30,-30,-40,-50],
+    [-40,-20,  0,  0,  0,  0,-20,-40],
+    [-30,  0, 10, 15, 15, 10,  0,-30],
+    [-30,  5, 15, 20, 20, 15,  5,-30],
+    [-30,  0, 15, 20, 20, 15,  0,-30],
+    [-30,  5, 10, 15, 15, 10,  5,-30],
+    [-40,-20,  0,  5,  5,  0,-20,-40],
+    [-50,-40,-30,-30,-30,-30,-40,-50]
+]
+BISHOPTABLE = [
+    [-20,-10,-10,-10,-10,-10,-10,-20],
+    [-10,  0,  0,  0,  0,  0,  0,-10],
+    [-10,  0,  5, 10, 10,  5,  0,-10],
+    [-10,  5,  5, 10, 10,  5,  5,-10],
+    [-10,  0, 10, 10, 10, 10,  0,-10],
+    [-10, 10, 10, 10, 10, 10, 10,-10],
+    [-10,  5,  0,  0,  0,  0,  5,-10],
+    [-20,-10,-10,-10,-10,-10,-10,-20]
+]
+ROOKTABLE = [
+    [ 0,  0,  0,  0,  0,  0,  0,  0],
+    [ 5, 10, 10, 10, 10, 10, 10,  5],
+    [-5,  0,  0,  0,  0,  0,  0, -5],
+    [-5,  0,  0,  0,  0,  0,  0, -5],
+    [-5,  0,  0,  0,  0,  0,  0, -5],
+    [-5,  0,  0,  0,  0,  0,  0, -5],
+    [-5,  0,  0,  0,  0,  0,  0, -5],
+    [ 0,  0,  0,  5,  5,  0,  0,  0]
+]
+QUEENTABLE = [
+    [-20,-10,-10, -5, -5,-10,-10,-20],
+    [-10,  0,  0,  0,  0,  0,  0,-10],
+    [-10,  0,  5,  5,  5,  5,  0,-10],
+    [ -5,  0,  5,  5,  5,  5,  0, -5],
+    [  0,  0,  5,  5,  5,  5,  0, -5],
+    [-10,  5,  5,  5,  5,  5,  0,-10],
+    [-10,  0,  5,  0,  0,  0,  0,-10],
+    [-20,-10,-10, -5, -5,-10,-10,-20]
+]
+KINGTABLE = [
+    [ 20, 30, 10,  0,  0, 10, 30, 20],
+    [ 20, 20,  0,  0,  0,  0, 20, 20],
+    [-10,-20,-20,-20,-20,-20,-20,-10],
+    [-20,-30,-30,-40,-40,-30,-30,-20],
+    [-30,-40,-40,-50,-50,-40,-40,-30],
+    [-30,-40,-40,-50,-50,-40,-40,-30],
+    [-30,-40,-40,-50,-50,-40,-40,-30],
+    [-30,-40,-40,-50,-50,-40,-40,-30]
+]
+
+#by piece kind, pawn..king
+VALUES=(100,320,330,500,900,20000)
+TABLES=(PAWNTABLE,KNIGHTTABLE,BISHOPTABLE,ROOKTABLE,QUEENTABLE,KINGTABLE)
+
+#what one piece adds to the score, flattened: PST[code*64+sq]; the EMPTY row is all zero
+PST=[0]*((EMPTY+1)*64)
+for kind in (PAWN,KNIGHT,BISHOP,ROOK,QUEEN,KING):
+    for sq in range(64):
+        row,col=divmod(sq,8)
+        PST[kind*64+sq]=VALUES[kind]+TABLES[kind][row][col]
+        PST[(6+kind)*64+sq]=-VALUES[kind]-TABLES[kind][7-row][col]
+
+
+def pstscore(squares):
+    score=0
+    for sq in range(64):
+        score+=PST[squares[sq]*64+sq]
+    return score
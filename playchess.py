@@ -9,7 +9,8 @@ from pieces.knight import knight
 from pieces.bishop import bishop
 from pieces.king import king
 from pieces.pawn import pawn
-from player.AI import AI
+from player.AI import AI, budget
+from player.worker import searchworker
 import copy
 import pickle
 import os
@@ -29,6 +30,11 @@ chessBoard.createboard()
 chessBoard.printboard()
 movex=move()
 ai=AI()
+#searches run on background threads so the window stays live (see player/worker.py)
+ai_worker=searchworker(ai)
+hint_worker=searchworker(AI())
+#piece classes for the promotion letter the AI returns with its move
+PROMOTIONPIECES={'Q':queen,'R':rook,'N':knight,'B':bishop}
 
 allTiles= []
 allpieces=[]
@@ -130,6 +136,7 @@ def square(x,y,w,h,color):
     allTiles.append([color, [x,y,w,h]])
 
 def drawchesspieces(flipped=False):
+    gametiles = chessBoard.gameTiles
     xpos= 0
     ypos= 0
     color= 0
@@ -157,13 +164,13 @@ def drawchesspieces(flipped=False):
             
             square(xpos,ypos,width,height,sq_color)
             
-            if not chessBoard.gameTiles[rows][column].pieceonTile.tostring() == "-":
+            if not gametiles[rows][column].pieceonTile.tostring() == "-":
                 img = pygame.image.load("./chessart/"
-                                        + chessBoard.gameTiles[rows][column].pieceonTile.alliance[0].upper()
-                                        + chessBoard.gameTiles[rows][column].pieceonTile.tostring().upper()
+                                        + gametiles[rows][column].pieceonTile.alliance[0].upper()
+                                        + gametiles[rows][column].pieceonTile.tostring().upper()
                                         + ".png")
                 img=pygame.transform.scale(img, (100,100))
-                allpieces.append([img,[xpos,ypos],chessBoard.gameTiles[rows][column].pieceonTile])
+                allpieces.append([img,[xpos,ypos],gametiles[rows][column].pieceonTile])
             
             xpos += 100
             color +=1
@@ -467,6 +474,11 @@ if saki=='2 player':
                     saki = 'end_timeout_b'
                     quitgame = True
 
+        # A hint search started by the Hint button finishes in the background
+        hint = hint_worker.poll()
+        if hint is not None and hint[0] is not None:
+            hint_move = [[hint[0], hint[1]], [hint[2], hint[3]]]
+
         for event in pygame.event.get():
 
             if event.type == pygame.QUIT:
@@ -557,9 +569,8 @@ if saki=='2 player':
                     sc = copy.deepcopy(chessBoard.gameTiles)
                     # If turn is even (0, 2..), it's White's turn.
                     is_white = (turn % 2 == 0)
-                    # Use depth 2 for hints to be quick
-                    hy, hx, hfx, hfy = ai.evaluate(sc, 2, is_white)
-                    hint_move = [[hy, hx], [hfx, hfy]]
+                    # Use depth 2 for hints to be quick; the frame loop picks up the result
+                    hint_worker.start(sc, 2, is_white)
                     continue
 
                 if coord[0]>=810 and coord[0]<=990 and coord[1]>=180 and coord[1]<=230:
@@ -570,6 +581,7 @@ if saki=='2 player':
                     continue
 
                 if coord[0]>=810 and coord[0]<=990 and coord[1]>=350 and coord[1]<=400:
+                    hint_worker.cancel()
                     if len(history) > 0:
                         state = history.pop()
                         chessBoard.gameTiles = copy.deepcopy(state[0])
@@ -590,6 +602,7 @@ if saki=='2 player':
                         continue
 
                 if coord[0]>=810 and coord[0]<=990 and coord[1]>=450 and coord[1]<=500:
+                    hint_worker.cancel()
                     chessBoard = board()
                     chessBoard.createboard()
                     moves=[]
@@ -627,6 +640,7 @@ if saki=='2 player':
                     continue
 
                 if coord[0]>=810 and coord[0]<=990 and coord[1]>=650 and coord[1]<=700:
+                    hint_worker.cancel()
                     if os.path.exists('savegame.pkl'):
                         with open('savegame.pkl', 'rb') as f:
                             game_state = pickle.load(f)
@@ -804,6 +818,7 @@ if saki=='2 player':
                     for move in moves:
                         if move[0]==n and move[1]==m:
                             hint_move = [] # Clear hint on move
+                            hint_worker.cancel() # A pending hint is for the position before this move
                             history.append((copy.deepcopy(chessBoard.gameTiles), turn, white_time, black_time, copy.deepcopy(enpassant), copy.deepcopy(last_move), copy.deepcopy(move_log)))
                             turn=turn+1
                             is_capture = False
@@ -1097,6 +1112,11 @@ if saki=='ai':
                     saki = 'end_timeout_b'
                     quitgame = True
 
+        # A hint search started by the Hint button finishes in the background
+        hint = hint_worker.poll()
+        if hint is not None and hint[0] is not None:
+            hint_move = [[hint[0], hint[1]], [hint[2], hint[3]]]
+
         for event in pygame.event.get():
 
             if event.type == pygame.QUIT:
@@ -1171,86 +1191,6 @@ if saki=='ai':
 
 
 
-            if not turn%2==0 and promotion==False and not paused:
-
-                turn=turn+1
-                sc=copy.deepcopy(chessBoard.gameTiles)
-                y,x,fx,fy=ai.evaluate(sc, ai_depth)
-                m=fy
-                n=fx
-                is_capture = False
-                if chessBoard.gameTiles[n][m].pieceonTile.tostring() != '-':
-                    is_capture = True
-                if chessBoard.gameTiles[y][x].pieceonTile.tostring()=='K' or chessBoard.gameTiles[y][x].pieceonTile.tostring()=='R':
-                    chessBoard.gameTiles[y][x].pieceonTile.moved=True
-
-                if chessBoard.gameTiles[y][x].pieceonTile.tostring()=='K' and m==x+2:
-                    chessBoard.gameTiles[y][x+1].pieceonTile=chessBoard.gameTiles[y][x+3].pieceonTile
-                    s=updateposition(y,x+1)
-                    chessBoard.gameTiles[y][x+1].pieceonTile.position=s
-                    chessBoard.gameTiles[y][x+3].pieceonTile=nullpiece()
-                if chessBoard.gameTiles[y][x].pieceonTile.tostring()=='K' and m==x-2:
-                    chessBoard.gameTiles[y][x-1].pieceonTile=chessBoard.gameTiles[y][0].pieceonTile
-                    s=updateposition(y,x-1)
-                    chessBoard.gameTiles[y][x-1].pieceonTile.position=s
-                    chessBoard.gameTiles[y][0].pieceonTile=nullpiece()
-
-
-                if not len(enpassant)==0:
-                    chessBoard.gameTiles[enpassant[0]][enpassant[1]].pieceonTile.enpassant=False
-                    enpassant=[]
-                if chessBoard.gameTiles[y][x].pieceonTile.tostring()=='P' and y+1==n and x+1==m and chessBoard.gameTiles[n][m].pieceonTile.tostring()=='-':
-                    chessBoard.gameTiles[y][x+1].pieceonTile=nullpiece()
-                    is_capture = True
-                if chessBoard.gameTiles[y][x].pieceonTile.tostring()=='P' and y+1==n and x-1==m and chessBoard.gameTiles[n][m].pieceonTile.tostring()=='-':
-                    chessBoard.gameTiles[y][x-1].pieceonTile=nullpiece()
-                    is_capture = True
-
-                if chessBoard.gameTiles[y][x].pieceonTile.tostring()=='P' and n==y+2:
-                    chessBoard.gameTiles[y][x].pieceonTile.enpassant=True
-                    enpassant=[n,m]
-
-                if chessBoard.gameTiles[y][x].pieceonTile.tostring()=='P' and y+1==n and y==6:
-                    promotion=True
-
-                if is_capture:
-                    capture_sound.play()
-                else:
-                    move_sound.play()
-
-                if promotion==False:
-                    last_move = [[y, x], [n, m]]
-                    move_log.append(f"{get_notation(y, x)} to {get_notation(n, m)}")
-                    chessBoard.gameTiles[n][m].pieceonTile=chessBoard.gameTiles[y][x].pieceonTile
-                    chessBoard.gameTiles[y][x].pieceonTile=nullpiece()
-                    s=updateposition(n,m)
-                    chessBoard.gameTiles[n][m].pieceonTile.position=s
-                    allTiles.clear()
-                    allpieces.clear()
-                    chessBoard.printboard()
-                    drawchesspieces()
-                    moves=[]
-
-                if promotion==True:
-
-                    if chessBoard.gameTiles[y][x].pieceonTile.tostring()=='P':
-                        chessBoard.gameTiles[y][x].pieceonTile=nullpiece()
-                        chessBoard.gameTiles[n][m].pieceonTile=queen('Black',updateposition(n,m))
-                        move_log.append(f"{get_notation(y, x)} to {get_notation(n, m)}")
-                        last_move = [[y, x], [n, m]]
-                        allTiles.clear()
-                        allpieces.clear()
-                        chessBoard.printboard()
-                        drawchesspieces(flipped)
-                        moves=[]
-                        promote=[]
-                        promotion=False
-
-
-
-
-
-
             if event.type==pygame.MOUSEBUTTONDOWN:
                 coord = pygame.mouse.get_pos()
                 if coord[0]>=810 and coord[0]<=990 and coord[1]>=250 and coord[1]<=300:
@@ -1265,12 +1205,13 @@ if saki=='ai':
                     sc = copy.deepcopy(chessBoard.gameTiles)
                     # In AI mode, player is usually White (turn % 2 == 0)
                     is_white = (turn % 2 == 0)
-                    # Use depth 2 for hints
-                    hy, hx, hfx, hfy = ai.evaluate(sc, 2, is_white)
-                    hint_move = [[hy, hx], [hfx, hfy]]
+                    # Use depth 2 for hints; the frame loop picks up the result
+                    hint_worker.start(sc, 2, is_white)
                     continue
 
                 if coord[0]>=810 and coord[0]<=990 and coord[1]>=350 and coord[1]<=400:
+                    ai_worker.cancel()
+                    hint_worker.cancel()
                     if len(history) > 0:
                         state = history.pop()
                         chessBoard.gameTiles = copy.deepcopy(state[0])
@@ -1291,6 +1232,8 @@ if saki=='ai':
                         continue
 
                 if coord[0]>=810 and coord[0]<=990 and coord[1]>=450 and coord[1]<=500:
+                    ai_worker.cancel()
+                    hint_worker.cancel()
                     chessBoard = board()
                     chessBoard.createboard()
                     moves=[]
@@ -1328,6 +1271,8 @@ if saki=='ai':
                     continue
 
                 if coord[0]>=810 and coord[0]<=990 and coord[1]>=650 and coord[1]<=700:
+                    ai_worker.cancel()
+                    hint_worker.cancel()
                     if os.path.exists('savegame.pkl'):
                         with open('savegame.pkl', 'rb') as f:
                             game_state = pickle.load(f)
@@ -1350,6 +1295,8 @@ if saki=='ai':
                     continue
 
                 if coord[0]>=810 and coord[0]<=990 and coord[1]>=740 and coord[1]<=790:
+                    ai_worker.cancel()
+                    hint_worker.cancel()
                     saki = 'resigned_w'
                     quitgame = True
                     continue
@@ -1437,6 +1384,7 @@ if saki=='ai':
                     for move in moves:
                         if move[0]==n and move[1]==m:
                             hint_move = [] # Clear hint
+                            hint_worker.cancel() # A pending hint is for the position before this move
                             history.append((copy.deepcopy(chessBoard.gameTiles), turn, white_time, black_time, copy.deepcopy(enpassant), copy.deepcopy(last_move), copy.deepcopy(move_log)))
                             turn=turn+1
                             is_capture = False
@@ -1592,6 +1540,95 @@ if saki=='ai':
 
 
 
+        # The AI (Black) searches on a worker thread; the window keeps drawing and the clocks
+        # keep running until a later frame picks up its move. If it pondered White's reply,
+        # a correct guess keeps that search (often already finished) and a wrong one drops it
+        if not turn%2==0 and promotion==False and not paused and not quitgame:
+            if ai_worker.expected is not None and last_move:
+                ai_worker.played(last_move[0][0], last_move[0][1], last_move[1][0], last_move[1][1], budget(black_time))
+            ai_result=ai_worker.poll()
+            if ai_result is None and not ai_worker.busy:
+                ai_worker.start(copy.deepcopy(chessBoard.gameTiles), ai_depth, False, budget(black_time))
+            if ai_result is not None and ai_result[0] is not None:
+
+                hint_worker.cancel()
+                hint_move = []
+                turn=turn+1
+                y,x,fx,fy,promoted=ai_result
+                m=fy
+                n=fx
+                is_capture = False
+                if chessBoard.gameTiles[n][m].pieceonTile.tostring() != '-':
+                    is_capture = True
+                if chessBoard.gameTiles[y][x].pieceonTile.tostring()=='K' or chessBoard.gameTiles[y][x].pieceonTile.tostring()=='R':
+                    chessBoard.gameTiles[y][x].pieceonTile.moved=True
+
+                if chessBoard.gameTiles[y][x].pieceonTile.tostring()=='K' and m==x+2:
+                    chessBoard.gameTiles[y][x+1].pieceonTile=chessBoard.gameTiles[y][x+3].pieceonTile
+                    s=updateposition(y,x+1)
+                    chessBoard.gameTiles[y][x+1].pieceonTile.position=s
+                    chessBoard.gameTiles[y][x+3].pieceonTile=nullpiece()
+                if chessBoard.gameTiles[y][x].pieceonTile.tostring()=='K' and m==x-2:
+                    chessBoard.gameTiles[y][x-1].pieceonTile=chessBoard.gameTiles[y][0].pieceonTile
+                    s=updateposition(y,x-1)
+                    chessBoard.gameTiles[y][x-1].pieceonTile.position=s
+                    chessBoard.gameTiles[y][0].pieceonTile=nullpiece()
+
+
+                if not len(enpassant)==0:
+                    chessBoard.gameTiles[enpassant[0]][enpassant[1]].pieceonTile.enpassant=False
+                    enpassant=[]
+                if chessBoard.gameTiles[y][x].pieceonTile.tostring()=='P' and y+1==n and x+1==m and chessBoard.gameTiles[n][m].pieceonTile.tostring()=='-':
+                    chessBoard.gameTiles[y][x+1].pieceonTile=nullpiece()
+                    is_capture = True
+                if chessBoard.gameTiles[y][x].pieceonTile.tostring()=='P' and y+1==n and x-1==m and chessBoard.gameTiles[n][m].pieceonTile.tostring()=='-':
+                    chessBoard.gameTiles[y][x-1].pieceonTile=nullpiece()
+                    is_capture = True
+
+                if chessBoard.gameTiles[y][x].pieceonTile.tostring()=='P' and n==y+2:
+                    chessBoard.gameTiles[y][x].pieceonTile.enpassant=True
+                    enpassant=[n,m]
+
+                if chessBoard.gameTiles[y][x].pieceonTile.tostring()=='P' and y+1==n and y==6:
+                    promotion=True
+
+                if is_capture:
+                    capture_sound.play()
+                else:
+                    move_sound.play()
+
+                if promotion==False:
+                    last_move = [[y, x], [n, m]]
+                    move_log.append(f"{get_notation(y, x)} to {get_notation(n, m)}")
+                    chessBoard.gameTiles[n][m].pieceonTile=chessBoard.gameTiles[y][x].pieceonTile
+                    chessBoard.gameTiles[y][x].pieceonTile=nullpiece()
+                    s=updateposition(n,m)
+                    chessBoard.gameTiles[n][m].pieceonTile.position=s
+                    allTiles.clear()
+                    allpieces.clear()
+                    chessBoard.printboard()
+                    drawchesspieces()
+                    moves=[]
+
+                if promotion==True:
+
+                    if chessBoard.gameTiles[y][x].pieceonTile.tostring()=='P':
+                        chessBoard.gameTiles[y][x].pieceonTile=nullpiece()
+                        chessBoard.gameTiles[n][m].pieceonTile=PROMOTIONPIECES[promoted or 'Q']('Black',updateposition(n,m))
+                        move_log.append(f"{get_notation(y, x)} to {get_notation(n, m)}")
+                        last_move = [[y, x], [n, m]]
+                        allTiles.clear()
+                        allpieces.clear()
+                        chessBoard.printboard()
+                        drawchesspieces(flipped)
+                        moves=[]
+                        promote=[]
+                        promotion=False
+
+                # Think on White's time about the reply the search expects
+                if not quitgame:
+                    ai_worker.ponder(copy.deepcopy(chessBoard.gameTiles), ai_depth, False)
+
         if paused:
             pygame.draw.rect(gamedisplay, BACKGROUND_COLOR, [0, 0, 800, 800])
             text_p = font.render('PAUSED', True, TEXT_COLOR)
@@ -1829,6 +1866,11 @@ if saki=='tutorial':
     selected_piece_pos = None
 
     while not quitgame:
+        # A hint search started by the Hint button finishes in the background
+        hint = hint_worker.poll()
+        if hint is not None and hint[0] is not None:
+            hint_move = [[hint[0], hint[1]], [hint[2], hint[3]]]
+
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 quitgame= True
@@ -1859,8 +1901,7 @@ if saki=='tutorial':
                 if coord[0]>=810 and coord[0]<=990 and coord[1]>=80 and coord[1]<=120:
                     sc = copy.deepcopy(chessBoard.gameTiles)
                     is_white = (turn % 2 == 0)
-                    hy, hx, hfx, hfy = ai.evaluate(sc, 3, is_white)
-                    hint_move = [[hy, hx], [hfx, hfy]]
+                    hint_worker.start(sc, 3, is_white)
                     continue
 
                 # Board Interaction (Only allow White moves)
@@ -1891,6 +1932,7 @@ if saki=='tutorial':
                                 move_sound.play()
                                 moves = []
                                 hint_move = []
+                                hint_worker.cancel() # A pending hint is for the position before this move
                                 turn += 1
                                 moves_made_count += 1
                                 allTiles.clear()
@@ -1929,7 +1971,7 @@ if saki=='tutorial':
                 # Simple AI move
                 sc = copy.deepcopy(chessBoard.gameTiles)
                 # AI plays Black, depth 2 is enough for puzzles
-                y_ai, x_ai, fy_ai, fx_ai = ai.evaluate(sc, 2, False)
+                y_ai, x_ai, fy_ai, fx_ai, _ = ai.evaluate(sc, 2, False)
                 
                 if y_ai is None:
                     continue
@@ -2049,19 +2091,22 @@ if saki=='spectator':
                     paused = not paused
                 # Reset
                 if coord[0]>=810 and coord[0]<=990 and coord[1]>=450 and coord[1]<=500:
+                    ai_worker.cancel()
                     chessBoard = board(); chessBoard.createboard(); moves=[]; enpassant=[]; promote=[]; promotion=False; turn=0; flipped=False; hint_move=[]; paused=False; move_log=[]; history=[]; white_time=TIME_LIMIT; black_time=TIME_LIMIT; last_move=[]; allTiles.clear(); allpieces.clear(); chessBoard.printboard(); drawchesspieces(flipped)
                 # Menu/Quit (Resign button acts as quit to menu here)
                 if coord[0]>=810 and coord[0]<=990 and coord[1]>=740 and coord[1]<=790:
                     quitgame=True; pygame.quit(); quit()
 
+        # AI Logic: the side to move searches on the worker thread and a later frame plays the move
+        result = None
         if not paused and not quitgame:
-            # AI Logic
-            sc = copy.deepcopy(chessBoard.gameTiles)
-            is_white_turn = (turn % 2 == 0)
-            
-            # Calculate Move
-            y, x, fx, fy = ai.evaluate(sc, ai_depth, is_white_turn)
-            
+            result = ai_worker.poll()
+            if result is None and not ai_worker.busy:
+                ai_worker.start(copy.deepcopy(chessBoard.gameTiles), ai_depth, turn % 2 == 0)
+
+        if result is not None and result[0] is not None:
+            y, x, fx, fy, promoted = result
+
             # Execute Move
             m, n = fy, fx
             is_capture = False
@@ -2108,11 +2153,11 @@ if saki=='spectator':
             chessBoard.gameTiles[y][x].pieceonTile = nullpiece()
             chessBoard.gameTiles[n][m].pieceonTile.position = updateposition(n, m)
 
-            # Handle Promotion (Auto-Queen)
+            # Handle Promotion (to the piece the search chose)
             if piece_char == 'P' and n == 7:
-                chessBoard.gameTiles[n][m].pieceonTile = queen('Black', updateposition(n, m))
+                chessBoard.gameTiles[n][m].pieceonTile = PROMOTIONPIECES[promoted or 'Q']('Black', updateposition(n, m))
             if piece_char == 'p' and n == 0:
-                chessBoard.gameTiles[n][m].pieceonTile = queen('White', updateposition(n, m))
+                chessBoard.gameTiles[n][m].pieceonTile = PROMOTIONPIECES[promoted or 'Q']('White', updateposition(n, m))
 
             # Play Sound
             if is_capture: capture_sound.play()
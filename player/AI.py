@@ -1,51 +1,261 @@
-from board.move import move
-from pieces.nullpiece import nullpiece
-from pieces.queen import queen
+from board.bitboard import bitboard, movecoords, promotionpiece, CAPTURE, PROMOTION
+from pieces.codes import WHITE, BLACK, ROOK, KING, makecode
+from pieces.values import VALUES
+from array import array
 import random
+import time
+
+#transposition table bound types
+EXACT=0
+LOWER=1
+UPPER=2
+
+SCOREBIAS=1<<31
+
+MAXPLY=64
+
+#a side that is mated scores MATE-ply against it (from white's side: -MATE+ply when white
+#is mated), so a shorter mate scores higher; anything beyond MATEBOUND is a mate score
+MATE=1000000
+MATEBOUND=MATE-1000
+
+#margin on top of the captured piece that a capture has to be able to reach to be
+#worth searching in quiesce
+DELTA=200
+
+
+class searchtimeout(Exception):
+    pass
+
+
+def budget(clock,movestogo=30):
+    #seconds to think about one move with clock seconds left: an even share over the
+    #moves still expected, never more than half of what is left
+    return max(0.05,min(clock/movestogo,clock/2))
+
+
+def tott(score,ply):
+    #mate scores count plies from the root; the table keeps them counted from the node
+    if score>MATEBOUND:
+        return score+ply
+    if score<-MATEBOUND:
+        return score-ply
+    return score
+
+def fromtt(score,ply):
+    if score>MATEBOUND:
+        return score-ply
+    if score<-MATEBOUND:
+        return score+ply
+    return score
+
+
+class transpositiontable:
+
+    #fixed size table of searched positions kept in two flat arrays of 64 bit words, the
+    #zobrist key and a packed entry per slot: score+SCOREBIAS | depth<<32 | bound<<40 |
+    #move<<42 | age<<58. Slots are grouped in buckets of BUCKET that share one index;
+    #a new entry replaces the same position, an empty slot, an entry left over from an
+    #earlier search, or else the shallowest entry of the bucket.
+    #The key word holds key^entry, so a slot only matches when both words come from the
+    #same store: processes sharing the table (player/smp.py) need no lock, a slot torn
+    #by two writers just reads as a miss
+    BUCKET=4
+
+    def __init__(self,mb=16,buffer=None):
+        #buffer: optional writable buffer of nbytes(mb) bytes to keep the table in,
+        #e.g. a multiprocessing.shared_memory block
+        self.resize(mb,buffer)
+
+    @classmethod
+    def buckets(cls,mb):
+        buckets=max(1,(int(mb*(1<<20))//16)//cls.BUCKET)
+        return 1<<(buckets.bit_length()-1)
+
+    @classmethod
+    def nbytes(cls,mb):
+        return cls.buckets(mb)*cls.BUCKET*16
+
+    def resize(self,mb,buffer=None):
+        buckets=self.buckets(mb)
+        slots=buckets*self.BUCKET
+        self.mb=slots*16/(1<<20)
+        self.mask=buckets-1
+        self.buffer=buffer
+        if buffer is None:
+            self.keys=array('Q',bytes(8*slots))
+            self.data=array('Q',bytes(8*slots))
+        else:
+            words=memoryview(buffer)[:16*slots].cast('Q')
+            self.keys=words[:slots]
+            self.data=words[slots:]
+        self.age=0
+        self.resetstats()
+
+    def clear(self):
+        if self.buffer is None:
+            self.resize(self.mb)
+        else:
+            memoryview(self.buffer)[:self.nbytes(self.mb)]=bytes(self.nbytes(self.mb))
+
+    def release(self):
+        #drops the views into a shared buffer so its owner can close it
+        if self.buffer is not None:
+            self.keys.release()
+            self.data.release()
+            self.keys=self.data=self.buffer=None
+
+    def newsearch(self):
+        self.age=(self.age+1)&63
+        self.resetstats()
+
+    def resetstats(self):
+        self.probes=0
+        self.hits=0
+        self.cutoffs=0
+
+    def probe(self,key):
+        #(depth, bound, score, move) stored for key, or None
+        self.probes+=1
+        keys=self.keys
+        base=(key&self.mask)*self.BUCKET
+        data=self.data
+        for i in range(base,base+self.BUCKET):
+            d=data[i]
+            if keys[i]^d==key:
+                self.hits+=1
+                return (d>>32)&0xFF,(d>>40)&3,(d&0xFFFFFFFF)-SCOREBIAS,(d>>42)&0xFFFF
+        return None
+
+    def store(self,key,depth,bound,score,move):
+        keys=self.keys
+        data=self.data
+        base=(key&self.mask)*self.BUCKET
+        replace=base
+        worst=None
+        for i in range(base,base+self.BUCKET):
+            if not data[i] or keys[i]^data[i]==key:
+                replace=i
+                break
+            d=data[i]
+            value=((d>>32)&0xFF)+(256 if d>>58==self.age else 0)
+            if worst is None or value<worst:
+                worst=value
+                replace=i
+        entry=(score+SCOREBIAS)|(depth<<32)|(bound<<40)|(move<<42)|(self.age<<58)
+        keys[replace]=key^entry
+        data[replace]=entry
+
+    def report(self):
+        probes=max(self.probes,1)
+        return f"tt {self.mb:g}MB: {self.probes} probes, {100*self.hits/probes:.1f}% hits, {100*self.cutoffs/probes:.1f}% cutoffs"
+
 
 class AI:
 
-    def __init__(self):
+    def __init__(self,ttsize=16,tt=None):
         self.best_moves = []
         self.depth = 3
-
-
-    def evaluate(self,gametiles, depth=3, is_white=False):
-        min_val=100000
-        max_val=-100000
-        count=0
-        count2=0
-        chuk=[]
-        movex=move()
-        self.best_moves.clear()
-        self.depth = depth
-        xp=self.minimax(gametiles,depth,-1000000000,1000000000,is_white)
-
-        for zoom in self.best_moves:
-            if not is_white:
-                if zoom[4]<min_val:
-                    chuk.clear()
-                    chuk.append(zoom)
-                    min_val=zoom[4]
-                elif zoom[4]==min_val:
-                    chuk.append(zoom)
-            else:
-                if zoom[4]>max_val:
-                    chuk.clear()
-                    chuk.append(zoom)
-                    max_val=zoom[4]
-                elif zoom[4]==max_val:
-                    chuk.append(zoom)
-        if len(chuk) == 0:
-            return None, None, None, None
-        fx=random.randrange(len(chuk))
-        return chuk[fx][0],chuk[fx][1],chuk[fx][2],chuk[fx][3]
+        self.nodes = 0
+        self.deadline = None
+        self.rootmove = 0
+        self.bestmove = 0
+        #the reply the last search expects to bestmove, 0 if it has none (see ponder())
+        self.pondermove = 0
+        self.completed = 0
+        self.start = 0
+        self.movetime = None
+        self.tt = tt if tt is not None else transpositiontable(ttsize)
+        #set from another process (multiprocessing.Event) to end the search early
+        self.stop = None
+        self.killers = [[0,0] for ply in range(MAXPLY)]
+        self.history = [[0]*4096,[0]*4096]
+
+
+    def evaluate(self,gametiles, depth=3, is_white=False, movetime=None):
+        #gametiles may be a board.gameTiles grid or a bitboard position
+        #iterative deepening: searches depth 1, 2, ... up to depth, each iteration starting
+        #with the previous best move; with movetime (seconds, see budget()) it stops when
+        #time is up and plays the best move of the last iteration that finished.
+        #Returns (from row, from col, to row, to col, promotion piece or None)
+        if isinstance(gametiles,bitboard):
+            position=gametiles
+            is_white=position.turn==WHITE
+        else:
+            position=bitboard()
+            position.loadtiles(gametiles,WHITE if is_white else BLACK)
+        self.nodes = 0
+        self.tt.newsearch()
+        self.killers = [[0,0] for ply in range(MAXPLY)]
+        self.history = [[0]*4096,[0]*4096]
+        self.deadline = None
+        self.rootmove = 0
+        self.completed = 0
+        self.pondermove = 0
+        self.movetime = movetime
+        best_moves = []
+        self.start = time.perf_counter()
+        played = len(position.history)
+        for iteration in range(1, depth+1):
+            self.depth = iteration
+            self.best_moves = []
+            try:
+                score=self.minimax(position,iteration,-1000000000,1000000000,is_white)
+            except searchtimeout:
+                while len(position.history) > played:
+                    position.unmake()
+                break
+            best_moves = self.best_moves
+            self.completed = iteration
+            if best_moves:
+                self.rootmove = best_moves[0]
+            if abs(score) > MATEBOUND:
+                #the shortest mate within this depth is proven; deeper iterations cannot beat it
+                break
+            if self.movetime is not None:
+                #the first iteration always finishes; a new one is not started once half the
+                #time is gone since it would most likely be cut off
+                self.deadline = self.start+self.movetime
+                if time.perf_counter()-self.start > self.movetime/2:
+                    break
+        self.deadline = None
+        self.best_moves = best_moves
+
+        if len(self.best_moves) == 0:
+            self.bestmove = 0
+            return None, None, None, None, None
+        #the encoded move is kept for callers that work on a bitboard
+        self.bestmove=random.choice(self.best_moves)
+        self.pondermove=self.expectedreply(position,self.bestmove)
+        return movecoords(self.bestmove)+(promotionpiece(self.bestmove),)
+
+    def expectedreply(self,position,move):
+        #the hash move stored for the position after move, i.e. the next move of the
+        #principal variation, if it is a legal move there
+        position.make(move)
+        entry=self.tt.probe(position.key)
+        reply=entry[3] if entry is not None else 0
+        if reply not in position.legalmoves():
+            reply=0
+        position.unmake()
+        return reply
+
+    def ponderhit(self,movetime):
+        #called from another thread when the move a ponder search assumed is played: the
+        #running search keeps what it has and from now on runs on the clock like
+        #evaluate(movetime=...)
+        if movetime is None:
+            return
+        self.start=time.perf_counter()
+        self.movetime=movetime
+        if self.completed:
+            self.deadline=self.start+movetime
 
 
     def reset(self,gametiles):
         for x in range(8):
             for y in range(8):
-                if gametiles[x][y].pieceonTile.tostring()=='k' or gametiles[x][y].pieceonTile.tostring()=='r':
+                if gametiles[x][y].pieceonTile.code in (makecode(WHITE,KING),makecode(WHITE,ROOK)):
                     gametiles[x][y].pieceonTile.moved=False
 
 
@@ -54,114 +264,199 @@ class AI:
         b=a+y
         return b
 
-    def checkmate(self,gametiles):
-        movex=move()
-        if movex.checkw(gametiles)[0]=='checked':
-            array=movex.movesifcheckedw(gametiles)
-            if len(array)==0:
-                return True
-
-        if movex.checkb(gametiles)[0]=='checked' :
-            array=movex.movesifcheckedb(gametiles)
-            if len(array)==0:
-                return True
-
-    def stalemate(self,gametiles,player):
-        movex=move()
-        if player==False:
-            if movex.checkb(gametiles)[0]=='notchecked':
-                check=False
-                for x in range(8):
-                    for y in range(8):
-                        if gametiles[y][x].pieceonTile.alliance=='Black':
-                            moves1=gametiles[y][x].pieceonTile.legalmoveb(gametiles)
-                            lx1=movex.pinnedb(gametiles,moves1,y,x)
-                            if len(lx1)==0:
-                                continue
-                            else:
-                                check=True
-                            if check==True:
-                                break
-                    if check==True:
-                        break
-
-                if check==False:
-                    return True
-
-        if player==True:
-                if movex.checkw(gametiles)[0]=='notchecked':
-                    check=False
-                    for x in range(8):
-                        for y in range(8):
-                            if gametiles[y][x].pieceonTile.alliance=='White':
-                                moves1=gametiles[y][x].pieceonTile.legalmoveb(gametiles)
-                                lx1=movex.pinnedw(gametiles,moves1,y,x)
-                                if len(lx1)==0:
-                                    continue
-                                else:
-                                    check=True
-                                if check==True:
-                                    break
-                        if check==True:
-                            break
-
-                    if check==False:
-                        return True
-
-
-
-
-
-
-    def minimax(self,gametiles, depth,alpha , beta ,player):
-        if depth==0 or self.checkmate(gametiles)==True or self.stalemate(gametiles,player)==True:
-            return self.calculateb(gametiles)
+
+
+    def minimax(self,position, depth,alpha , beta ,player):
+        self.nodes+=1
+        if not self.nodes&255 and self.interrupted():
+            raise searchtimeout()
+        ttmove=0
+        if depth>0:
+            entry=self.tt.probe(position.key)
+            #the root still has to collect all of its best moves, so it never stops here
+            if entry is not None and entry[0]>=depth and depth<self.depth:
+                score=fromtt(entry[2],self.depth-depth)
+                if entry[1]==EXACT or (entry[1]==LOWER and score>=beta) or (entry[1]==UPPER and score<=alpha):
+                    self.tt.cutoffs+=1
+                    return score
+            if entry is not None:
+                ttmove=entry[3]
+            if depth==self.depth and self.rootmove:
+                ttmove=self.rootmove
+        if depth==0:
+            return self.quiesce(position,alpha,beta,player)
+        alpha0,beta0=alpha,beta
+        best=0
+        ply=self.depth-depth
+        moves=self.stagedmoves(position,player,ttmove,ply)
         if not player:
             minEval=100000000
-            kp,ks=self.eva(gametiles,player)
-            for lk in kp:
-                for move in lk:
-                    mts=gametiles[move[2]][move[3]].pieceonTile
-                    gametiles=self.move(gametiles,move[0],move[1],move[2],move[3])
-                    evalk=self.minimax(gametiles,depth-1,alpha,beta,True)
-                    if evalk<minEval and depth==self.depth:
-                        self.best_moves.clear()
-                        self.best_moves.append(move)
-                    if evalk==minEval and depth==self.depth:
-                        self.best_moves.append(move)
-                    minEval=min(minEval,evalk)
-                    beta=min(beta,evalk)
-                    gametiles=self.revmove(gametiles,move[2],move[3],move[0],move[1],mts)
-                    if beta<=alpha:
-                        break
-
+            for move in moves:
+                position.make(move)
+                #at the root the window is widened by one, so a move that only ties the best
+                #so far gets its exact score instead of a fail-soft bound equal to it
+                evalk=self.minimax(position,depth-1,alpha,beta+1 if depth==self.depth else beta,True)
+                position.unmake()
+                if evalk<minEval and depth==self.depth:
+                    self.best_moves.clear()
+                    self.best_moves.append(move)
+                if evalk==minEval and depth==self.depth:
+                    self.best_moves.append(move)
+                if evalk<minEval:
+                    best=move
+                minEval=min(minEval,evalk)
+                beta=min(beta,evalk)
                 if beta<=alpha:
+                    self.cutoff(position,move,depth,ply)
                     break
+            if not best:
+                #no legal move: the generation above doubles as the mate/stalemate test
+                return self.terminal(position,player,ply)
+            self.storett(position,depth,minEval,alpha0,beta0,best,ply)
             return minEval
 
         else:
             maxEval=-100000000
-            kp,ks=self.eva(gametiles,player)
-            for lk in ks:
-                for move in lk:
-                    mts=gametiles[move[2]][move[3]].pieceonTile
-                    gametiles=self.movew(gametiles,move[0],move[1],move[2],move[3])
-                    evalk=self.minimax(gametiles,depth-1,alpha,beta,False)
-                    if evalk>maxEval and depth==self.depth:
-                        self.best_moves.clear()
-                        self.best_moves.append(move)
-                    if evalk==maxEval and depth==self.depth:
-                        self.best_moves.append(move)
-                    maxEval=max(maxEval,evalk)
-                    alpha=max(alpha,evalk)
-                    gametiles=self.revmove(gametiles,move[2],move[3],move[0],move[1],mts)
-                    if beta<=alpha:
-                        break
+            for move in moves:
+                position.make(move)
+                evalk=self.minimax(position,depth-1,alpha-1 if depth==self.depth else alpha,beta,False)
+                position.unmake()
+                if evalk>maxEval and depth==self.depth:
+                    self.best_moves.clear()
+                    self.best_moves.append(move)
+                if evalk==maxEval and depth==self.depth:
+                    self.best_moves.append(move)
+                if evalk>maxEval:
+                    best=move
+                maxEval=max(maxEval,evalk)
+                alpha=max(alpha,evalk)
                 if beta<=alpha:
+                    self.cutoff(position,move,depth,ply)
                     break
-
+            if not best:
+                return self.terminal(position,player,ply)
+            self.storett(position,depth,maxEval,alpha0,beta0,best,ply)
             return maxEval
 
+    def interrupted(self):
+        if self.deadline is not None and time.perf_counter()>self.deadline:
+            return True
+        return self.stop is not None and self.stop.is_set()
+
+    def terminal(self,position,player,ply):
+        #checkmate, scored by distance from the root, or stalemate, a draw
+        if not position.incheck():
+            return 0
+        return -MATE+ply if player else MATE-ply
+
+    def quiesce(self,position,alpha,beta,player):
+        #beyond the nominal depth only captures and promotions are searched, so a leaf is
+        #never scored in the middle of an exchange; the side to move may also stand pat
+        #on the static score, and captures that cannot lift the score back to the window
+        #even with DELTA to spare are skipped
+        self.nodes+=1
+        if not self.nodes&255 and self.interrupted():
+            raise searchtimeout()
+        stand=self.calculateb(position)
+        if player:
+            if stand>=beta:
+                return stand
+            alpha=max(alpha,stand)
+        else:
+            if stand<=alpha:
+                return stand
+            beta=min(beta,stand)
+        best=stand
+        squares=position.squares
+        noisy=[move for move in position.legalmoves() if move>>12&(CAPTURE|PROMOTION)]
+        for move in self.ordernoisy(position,noisy):
+            flag=move>>12
+            gain=VALUES[squares[(move>>6)&63]%6] if flag&CAPTURE else 0
+            if flag&PROMOTION:
+                gain+=VALUES[1+(flag&3)]-VALUES[0]
+            if player and stand+gain+DELTA<=alpha:
+                continue
+            if not player and stand-gain-DELTA>=beta:
+                continue
+            position.make(move)
+            score=self.quiesce(position,alpha,beta,not player)
+            position.unmake()
+            if player:
+                if score>best:
+                    best=score
+                alpha=max(alpha,score)
+            else:
+                if score<best:
+                    best=score
+                beta=min(beta,score)
+            if beta<=alpha:
+                break
+        return best
+
+    def stagedmoves(self,position,player,ttmove,ply):
+        #moves come in stages and a stage is only prepared once the moves before it
+        #failed to cut off: the hash move before any generation, then captures and
+        #promotions by most valuable victim / least valuable attacker, then the two
+        #killers of this ply, then the other quiet moves by history score
+        squares=position.squares
+        if ttmove and squares[ttmove&63]//6==position.turn and squares[(ttmove>>6)&63]//6!=position.turn:
+            #the entry matched the full 64 bit key, so its move was legal in this very
+            #position; the piece check only guards against a key collision
+            yield ttmove
+        else:
+            ttmove=0
+        noisy=[]
+        quiet=[]
+        for move in self.eva(position,player):
+            if move==ttmove:
+                continue
+            if move>>12&(CAPTURE|PROMOTION):
+                noisy.append(move)
+            else:
+                quiet.append(move)
+        yield from self.ordernoisy(position,noisy)
+        if ply<MAXPLY:
+            for killer in tuple(self.killers[ply]):
+                if killer in quiet:
+                    quiet.remove(killer)
+                    yield killer
+        history=self.history[position.turn]
+        quiet.sort(key=lambda move:history[move&4095],reverse=True)
+        yield from quiet
+
+    def ordernoisy(self,position,moves):
+        #squares[to]%6 is the victim's kind, and a pawn (EMPTY%6) for en passant
+        squares=position.squares
+        def score(move):
+            value=(squares[(move>>6)&63]%6)*8-squares[move&63]%6
+            if move>>12&PROMOTION:
+                value+=(1+(move>>12&3))*64
+            return value
+        moves.sort(key=score,reverse=True)
+        return moves
+
+    def cutoff(self,position,move,depth,ply):
+        #a quiet move that refuted this node becomes a killer for the ply and earns
+        #history credit for the side to move
+        if move>>12&(CAPTURE|PROMOTION):
+            return
+        if ply<MAXPLY:
+            killers=self.killers[ply]
+            if killers[0]!=move:
+                killers[1]=killers[0]
+                killers[0]=move
+        self.history[position.turn][move&4095]+=depth*depth
+
+    def storett(self,position,depth,value,alpha,beta,move,ply):
+        #scores are from white's side at every node, so the bound follows from the window alone
+        if value<=alpha:
+            bound=UPPER
+        elif value>=beta:
+            bound=LOWER
+        else:
+            bound=EXACT
+        self.tt.store(position.key,depth,bound,tott(value,ply),move)
+
 
 
     def printboard(self,gametiles):
@@ -172,372 +467,10 @@ class AI:
             print("|",end='\n')
 
 
-    def checkeva(self,gametiles,moves):
-        arr=[]
-        for move in moves:
-            lk=[[move[2],move[3]]]
-            arr.append(self.calci(gametiles,move[0],move[1],lk))
-
-        return arr
-
-
-
-    def eva(self,gametiles,player):
-        lx=[]
-        moves=[]
-        kp=[]
-        ks=[]
-        movex=move()
-        for x in range(8):
-            for y in range(8):
-                    if gametiles[y][x].pieceonTile.alliance=='Black' and player==False:
-                        if movex.checkb(gametiles)[0]=='checked':
-                            moves=movex.movesifcheckedb(gametiles)
-                            arr=self.checkeva(gametiles,moves)
-                            kp=arr
-                            return kp,ks
-                        moves=gametiles[y][x].pieceonTile.legalmoveb(gametiles)
-                        if len(moves)==0:
-                            continue
-                        else:
-                            if(gametiles[y][x].pieceonTile.tostring()=='K'):
-                                ax=movex.castlingb(gametiles)
-                                if not len(ax)==0:
-                                    for l in ax:
-                                        if l=='ks':
-                                            moves.append([0,6])
-                                        if l=='qs':
-                                            moves.append([0,2])
-                        if gametiles[y][x].pieceonTile.alliance=='Black':
-                            lx=movex.pinnedb(gametiles,moves,y,x)
-                        moves=lx
-                        if len(moves)==0:
-                            continue
-                        kp.append(self.calci(gametiles,y,x,moves))
-
-
-                    if gametiles[y][x].pieceonTile.alliance=='White' and player==True:
-                        if movex.checkw(gametiles)[0]=='checked':
-                            moves=movex.movesifcheckedw(gametiles)
-                            arr=self.checkeva(gametiles,moves)
-                            ks=arr
-                            return kp,ks
-                        moves=gametiles[y][x].pieceonTile.legalmoveb(gametiles)
-                        if len(moves)==0:
-                            continue
-                        else:
-                            if(gametiles[y][x].pieceonTile.tostring()=='k'):
-                                ax=movex.castlingw(gametiles)
-                                if not len(ax)==0:
-                                    for l in ax:
-                                        if l=='ks':
-                                            moves.append([7,6])
-                                        if l=='qs':
-                                            moves.append([7,2])
-                        if gametiles[y][x].pieceonTile.alliance=='White':
-                            lx=movex.pinnedw(gametiles,moves,y,x)
-                        moves=lx
-                        if len(moves)==0:
-                            continue
-                        ks.append(self.calci(gametiles,y,x,moves))
-
-        return kp,ks
-
-
-
-    def calci(self,gametiles,y,x,moves):
-        arr=[]
-        for move in moves:
-            jk=gametiles[move[0]][move[1]].pieceonTile
-            gametiles[move[0]][move[1]].pieceonTile=gametiles[y][x].pieceonTile
-            gametiles[y][x].pieceonTile=nullpiece()
-            mk=self.calculateb(gametiles)
-            gametiles[y][x].pieceonTile=gametiles[move[0]][move[1]].pieceonTile
-            gametiles[move[0]][move[1]].pieceonTile=jk
-            arr.append([y,x,move[0],move[1],mk])
-        return arr
-
-
-    def calculateb(self,gametiles):
-        pawntable = [
-            [ 0,  0,  0,  0,  0,  0,  0,  0],
-            [ 50, 50, 50, 50, 50, 50, 50, 50],
-            [ 10, 10, 20, 30, 30, 20, 10, 10],
-            [ 5,  5, 10, 25, 25, 10,  5,  5],
-            [ 0,  0,  0, 20, 20,  0,  0,  0],
-            [ 5, -5,-10,  0,  0,-10, -5,  5],
-            [ 5, 10, 10,-20,-20, 10, 10,  5],
-            [ 0,  0,  0,  0,  0,  0,  0,  0]
-        ]
-        knightstable = [
-            [-50,-40,-30,-30,-30,-30,-40,-50],
-            [-40,-20,  0,  0,  0,  0,-20,-40],
-            [-30,  0, 10, 15, 15, 10,  0,-30],
-            [-30,  5, 15, 20, 20, 15,  5,-30],
-            [-30,  0, 15, 20, 20, 15,  0,-30],
-            [-30,  5, 10, 15, 15, 10,  5,-30],
-            [-40,-20,  0,  5,  5,  0,-20,-40],
-            [-50,-40,-30,-30,-30,-30,-40,-50]
-        ]
-        bishopstable = [
-            [-20,-10,-10,-10,-10,-10,-10,-20],
-            [-10,  0,  0,  0,  0,  0,  0,-10],
-            [-10,  0,  5, 10, 10,  5,  0,-10],
-            [-10,  5,  5, 10, 10,  5,  5,-10],
-            [-10,  0, 10, 10, 10, 10,  0,-10],
-            [-10, 10, 10, 10, 10, 10, 10,-10],
-            [-10,  5,  0,  0,  0,  0,  5,-10],
-            [-20,-10,-10,-10,-10,-10,-10,-20]
-        ]
-        rookstable = [
-            [ 0,  0,  0,  0,  0,  0,  0,  0],
-            [ 5, 10, 10, 10, 10, 10, 10,  5],
-            [-5,  0,  0,  0,  0,  0,  0, -5],
-            [-5,  0,  0,  0,  0,  0,  0, -5],
-            [-5,  0,  0,  0,  0,  0,  0, -5],
-            [-5,  0,  0,  0,  0,  0,  0, -5],
-            [-5,  0,  0,  0,  0,  0,  0, -5],
-            [ 0,  0,  0,  5,  5,  0,  0,  0]
-        ]
-        queenstable = [
-            [-20,-10,-10, -5, -5,-10,-10,-20],
-            [-10,  0,  0,  0,  0,  0,  0,-10],
-            [-10,  0,  5,  5,  5,  5,  0,-10],
-            [ -5,  0,  5,  5,  5,  5,  0, -5],
-            [  0,  0,  5,  5,  5,  5,  0, -5],
-            [-10,  5,  5,  5,  5,  5,  0,-10],
-            [-10,  0,  5,  0,  0,  0,  0,-10],
-            [-20,-10,-10, -5, -5,-10,-10,-20]
-        ]
-        kingstable = [
-            [ 20, 30, 10,  0,  0, 10, 30, 20],
-            [ 20, 20,  0,  0,  0,  0, 20, 20],
-            [-10,-20,-20,-20,-20,-20,-20,-10],
-            [-20,-30,-30,-40,-40,-30,-30,-20],
-            [-30,-40,-40,-50,-50,-40,-40,-30],
-            [-30,-40,-40,-50,-50,-40,-40,-30],
-            [-30,-40,-40,-50,-50,-40,-40,-30],
-            [-30,-40,-40,-50,-50,-40,-40,-30]
-        ]
-        piece_values = {
-                'P': -100, 'N': -320, 'B': -330, 'R': -500,
-                'Q': -900, 'K': -20000,
-                'p': 100, 'n': 320, 'b': 330, 'r': 500,
-                'q': 900, 'k': 20000
-                }
-        value = 0
-        for y in range(8):
-            for x in range(8):
-                piece_str = gametiles[y][x].pieceonTile.tostring()
-                if piece_str == '-':
-                    continue
-                piece_value = piece_values.get(piece_str, 0)
-                value += piece_value
-                
-                if piece_str == 'p':
-                    value += pawntable[y][x]
-                elif piece_str == 'P':
-                    value -= pawntable[7-y][x]
-                elif piece_str == 'n':
-                    value += knightstable[y][x]
-                elif piece_str == 'N':
-                    value -= knightstable[7-y][x]
-                elif piece_str == 'b':
-                    value += bishopstable[y][x]
-                elif piece_str == 'B':
-                    value -= bishopstable[7-y][x]
-                elif piece_str == 'r':
-                    value += rookstable[y][x]
-                elif piece_str == 'R':
-                    value -= rookstable[7-y][x]
-                elif piece_str == 'q':
-                    value += queenstable[y][x]
-                elif piece_str == 'Q':
-                    value -= queenstable[7-y][x]
-                elif piece_str == 'k':
-                    value += kingstable[y][x]
-                elif piece_str == 'K':
-                    value -= kingstable[7-y][x]
-                    
-        return value
-
-    def move(self,gametiles,y,x,n,m):
-        promotion=False
-        if gametiles[y][x].pieceonTile.tostring()=='K' or gametiles[y][x].pieceonTile.tostring()=='R':
-            gametiles[y][x].pieceonTile.moved=True
-
-        if gametiles[y][x].pieceonTile.tostring()=='K' and m==x+2:
-            gametiles[y][x+1].pieceonTile=gametiles[y][x+3].pieceonTile
-            s=self.updateposition(y,x+1)
-            gametiles[y][x+1].pieceonTile.position=s
-            gametiles[y][x+3].pieceonTile=nullpiece()
-        if gametiles[y][x].pieceonTile.tostring()=='K' and m==x-2:
-            gametiles[y][x-1].pieceonTile=gametiles[y][0].pieceonTile
-            s=self.updateposition(y,x-1)
-            gametiles[y][x-1].pieceonTile.position=s
-            gametiles[y][0].pieceonTile=nullpiece()
-
-
-
-        if gametiles[y][x].pieceonTile.tostring()=='P' and y+1==n and y==6:
-            promotion=True
-
-
-        if promotion==False:
-
-            gametiles[n][m].pieceonTile=gametiles[y][x].pieceonTile
-            gametiles[y][x].pieceonTile=nullpiece()
-            s=self.updateposition(n,m)
-            gametiles[n][m].pieceonTile.position=s
-
-        if promotion==True:
-
-            if gametiles[y][x].pieceonTile.tostring()=='P':
-                gametiles[y][x].pieceonTile=nullpiece()
-                gametiles[n][m].pieceonTile=queen('Black',self.updateposition(n,m))
-                promotion=False
-
-        return gametiles
-
-
-
-    def revmove(self,gametiles,x,y,n,m,mts):
-        if gametiles[x][y].pieceonTile.tostring()=='K':
-            if m==y-2:
-                gametiles[x][y].pieceonTile.moved=False
-                gametiles[n][m].pieceonTile=gametiles[x][y].pieceonTile
-                s=self.updateposition(n,m)
-                gametiles[n][m].pieceonTile.position=s
-                gametiles[n][7].pieceonTile=gametiles[x][y-1].pieceonTile
-                s=self.updateposition(n,7)
-                gametiles[n][7].pieceonTile.position=s
-                gametiles[n][7].pieceonTile.moved=False
-
-                gametiles[x][y].pieceonTile=nullpiece()
-                gametiles[x][y-1].pieceonTile=nullpiece()
-
-            elif m==y+2:
-                gametiles[x][y].pieceonTile.moved=False
-                gametiles[n][m].pieceonTile=gametiles[x][y].pieceonTile
-                s=self.updateposition(n,m)
-                gametiles[n][m].pieceonTile.position=s
-                gametiles[n][0].pieceonTile=gametiles[x][y+1].pieceonTile
-                s=self.updateposition(m,0)
-                gametiles[n][0].pieceonTile.position=s
-                gametiles[n][0].pieceonTile.moved=False
-                gametiles[x][y].pieceonTile=nullpiece()
-                gametiles[x][y-1].pieceonTile=nullpiece()
-
-            else:
-                gametiles[n][m].pieceonTile=gametiles[x][y].pieceonTile
-                s=self.updateposition(n,m)
-                gametiles[n][m].pieceonTile.position=s
-                gametiles[x][y].pieceonTile=mts
-
-            return gametiles
-
-        if gametiles[x][y].pieceonTile.tostring()=='k':
-            if m==y-2:
-
-                gametiles[n][m].pieceonTile=gametiles[x][y].pieceonTile
-                s=self.updateposition(n,m)
-                gametiles[n][m].pieceonTile.position=s
-                gametiles[n][7].pieceonTile=gametiles[x][y-1].pieceonTile
-                s=self.updateposition(n,7)
-                gametiles[n][7].pieceonTile.position=s
-                gametiles[x][y].pieceonTile=nullpiece()
-                gametiles[x][y-1].pieceonTile=nullpiece()
-
-
-            elif m==y+2:
-
-                gametiles[n][m].pieceonTile=gametiles[x][y].pieceonTile
-                s=self.updateposition(n,m)
-                gametiles[n][m].pieceonTile.position=s
-                gametiles[n][0].pieceonTile=gametiles[x][y+1].pieceonTile
-                s=self.updateposition(n,0)
-                gametiles[n][0].pieceonTile.position=s
-                gametiles[x][y].pieceonTile=nullpiece()
-                gametiles[x][y-1].pieceonTile=nullpiece()
-
-
-            else:
-                gametiles[n][m].pieceonTile=gametiles[x][y].pieceonTile
-                s=self.updateposition(n,m)
-                gametiles[n][m].pieceonTile.position=s
-                gametiles[x][y].pieceonTile=mts
-
-
-            return gametiles
-
-        gametiles[n][m].pieceonTile=gametiles[x][y].pieceonTile
-        s=self.updateposition(n,m)
-        gametiles[n][m].pieceonTile.position=s
-        gametiles[x][y].pieceonTile=mts
-
-        return gametiles
-
-
-
-    def movew(self,gametiles,y,x,n,m):
-        promotion=False
-        if gametiles[y][x].pieceonTile.tostring()=='k' or gametiles[y][x].pieceonTile.tostring()=='r':
-            pass
-
-        if gametiles[y][x].pieceonTile.tostring()=='k' and m==x+2:
-            gametiles[y][x+1].pieceonTile=gametiles[y][x+3].pieceonTile
-            s=self.updateposition(y,x+1)
-            gametiles[y][x+1].pieceonTile.position=s
-            gametiles[y][x+3].pieceonTile=nullpiece()
-        if gametiles[y][x].pieceonTile.tostring()=='k' and m==x-2:
-            gametiles[y][x-1].pieceonTile=gametiles[y][0].pieceonTile
-            s=self.updateposition(y,x-1)
-            gametiles[y][x-1].pieceonTile.position=s
-            gametiles[y][0].pieceonTile=nullpiece()
-
-
-
-        if gametiles[y][x].pieceonTile.tostring()=='p' and y-1==n and y==1:
-            promotion=True
-
-
-        if promotion==False:
-
-            gametiles[n][m].pieceonTile=gametiles[y][x].pieceonTile
-            gametiles[y][x].pieceonTile=nullpiece()
-            s=self.updateposition(n,m)
-            gametiles[n][m].pieceonTile.position=s
-
-        if promotion==True:
-
-            if gametiles[y][x].pieceonTile.tostring()=='p':
-                gametiles[y][x].pieceonTile=nullpiece()
-                gametiles[n][m].pieceonTile=queen('White',self.updateposition(n,m))
-                promotion=False
-
-        return gametiles
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+    def eva(self,position,player):
+        return position.legalmoves()
 
 
-                        
+    def calculateb(self,position):
+        #material and piece-square tables (pieces/values.py), kept up to date by make/unmake
+        return position.score
@@ -0,0 +1,34 @@
+#evaluate many positions at once with numpy, for analysis and training data
+#a batch is an (N,64) int8 array of piece codes laid out like bitboard.squares
+#(row*8+col, EMPTY for an empty square); scores are the same as AI.calculateb
+
+try:
+    import numpy as np
+except ImportError:
+    np=None
+
+from pieces.codes import EMPTY
+from pieces.values import PST
+
+if np is not None:
+    #the 12 piece rows of pieces/values.PST plus its all-zero EMPTY row, so a batch
+    #can index the table directly
+    TABLE=np.array(PST,dtype=np.int32).reshape(EMPTY+1,64)
+    SQUARES=np.arange(64)
+
+
+def requirenumpy():
+    if np is None:
+        raise ImportError("batch evaluation needs numpy: pip install numpy")
+
+
+def encode(positions):
+    #positions: bitboards (or anything with a 64 entry .squares list)
+    requirenumpy()
+    return np.array([position.squares for position in positions],dtype=np.int8).reshape(-1,64)
+
+
+def evaluate(boards):
+    requirenumpy()
+    boards=np.asarray(boards,dtype=np.int8)
+    return TABLE[boards,SQUARES].sum(axis=1,dtype=np.int64)
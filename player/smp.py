@@ -0,0 +1,89 @@
+#lazy SMP: several processes search the same root and only talk through one transposition
+#table in shared memory (entries are checked with the key^entry word, so no locks). Every
+#other helper aims one ply deeper than asked, so helpers run ahead and fill the table
+#with entries and hash moves the main search then picks up. The main search runs in
+#this process; once it is done the helpers are stopped and the deepest completed
+#result of all of them is played.
+
+import multiprocessing
+import os
+import queue
+import random
+from multiprocessing import shared_memory
+
+from board.bitboard import bitboard, movecoords, promotionpiece
+from player.AI import AI, transpositiontable
+from pieces.codes import WHITE, BLACK
+
+
+def helper(name,mb,position,depth,is_white,stop,results,index):
+    memory=shared_memory.SharedMemory(name=name)
+    tt=transpositiontable(mb,memory.buf)
+    ai=AI(tt=tt)
+    ai.stop=stop
+    try:
+        ai.evaluate(position,depth,is_white)
+        results.put((index,ai.completed,ai.best_moves,ai.nodes))
+    finally:
+        tt.release()
+        memory.close()
+
+
+class smpsearch:
+
+    def __init__(self,workers=None,ttsize=16):
+        #workers counts the processes including this one, os.cpu_count() by default
+        self.workers=max(1,workers or os.cpu_count() or 1)
+        self.ttsize=ttsize
+        self.best_moves=[]
+        self.bestmove=0
+        self.completed=0
+        self.nodes=0
+
+    def evaluate(self,gametiles,depth=3,is_white=False,movetime=None):
+        #same arguments and result as AI.evaluate
+        if isinstance(gametiles,bitboard):
+            position=gametiles
+            is_white=position.turn==WHITE
+        else:
+            position=bitboard()
+            position.loadtiles(gametiles,WHITE if is_white else BLACK)
+        memory=shared_memory.SharedMemory(create=True,size=transpositiontable.nbytes(self.ttsize))
+        stop=multiprocessing.Event()
+        results=multiprocessing.Queue()
+        helpers=[]
+        ai=AI(tt=transpositiontable(self.ttsize,memory.buf))
+        try:
+            for index in range(1,self.workers):
+                process=multiprocessing.Process(target=helper,daemon=True,
+                    args=(memory.name,self.ttsize,position.copy(),depth+(index&1),is_white,stop,results,index))
+                process.start()
+                helpers.append(process)
+            ai.evaluate(position,depth,is_white,movetime)
+            stop.set()
+            completed,best_moves,nodes=ai.completed,ai.best_moves,ai.nodes
+            for process in helpers:
+                try:
+                    index,done,moves,count=results.get(timeout=10)
+                except queue.Empty:
+                    break
+                nodes+=count
+                if done>completed and moves:
+                    completed,best_moves=done,moves
+            for process in helpers:
+                process.join(1)
+                if process.is_alive():
+                    process.terminate()
+        finally:
+            stop.set()
+            ai.tt.release()
+            memory.close()
+            memory.unlink()
+        self.completed=completed
+        self.best_moves=best_moves
+        self.nodes=nodes
+        if not best_moves:
+            self.bestmove=0
+            return None, None, None, None, None
+        self.bestmove=random.choice(best_moves)
+        return movecoords(self.bestmove)+(promotionpiece(self.bestmove),)
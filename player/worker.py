@@ -0,0 +1,88 @@
+#runs AI.evaluate on a background thread so the pygame loop keeps drawing, handling events
+#and running the clocks while the engine thinks; the loop polls for the result once a frame.
+#The search holds the GIL most of the time, but the interpreter hands it over every few
+#milliseconds, which is plenty for a loop that mostly sleeps in clock.tick
+
+import queue
+import threading
+
+from board.bitboard import bitboard, movecoords, PROMOTION
+from pieces.codes import WHITE, BLACK
+
+
+class searchworker:
+
+    def __init__(self,ai):
+        #ai is only used by the worker thread while a search runs
+        self.ai=ai
+        self.results=queue.Queue()
+        self.thread=None
+        self.stop=threading.Event()
+        #bumped by every start and cancel, so results of an abandoned search are dropped
+        self.ticket=0
+        #(y,x,n,m) of the opponent move the running ponder search assumed
+        self.expected=None
+
+    @property
+    def busy(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self,gametiles,depth,is_white,movetime=None):
+        #gametiles must not be touched by the caller afterwards (pass a copy)
+        self.cancel()
+        self.stop=threading.Event()
+        self.ai.stop=self.stop
+        self.thread=threading.Thread(target=self.run,args=(self.ticket,gametiles,depth,is_white,movetime),daemon=True)
+        self.thread.start()
+
+    def run(self,ticket,gametiles,depth,is_white,movetime):
+        result=self.ai.evaluate(gametiles,depth,is_white,movetime)
+        self.results.put((ticket,result))
+
+    def poll(self):
+        #(y,x,n,m) of the finished search once, None while it runs or if nothing is pending
+        while True:
+            try:
+                ticket,result=self.results.get_nowait()
+            except queue.Empty:
+                return None
+            if ticket==self.ticket:
+                return result
+
+    def cancel(self):
+        #stops a running search (it ends within a few hundred nodes) and forgets its result
+        if self.busy:
+            self.stop.set()
+            self.thread.join()
+        self.ticket+=1
+        self.expected=None
+
+    def ponder(self,gametiles,depth,is_white):
+        #gametiles: the board right after our move (a copy). While the opponent thinks,
+        #search the position after the reply the last search expects; the work lands in
+        #the ai's transposition table either way. Promotions are not pondered, the
+        #client only learns the promoted piece later
+        reply=self.ai.pondermove
+        if not reply or reply>>12&PROMOTION:
+            return
+        position=bitboard()
+        position.loadtiles(gametiles,BLACK if is_white else WHITE)
+        if reply not in position.legalmoves():
+            return
+        position.make(reply)
+        self.start(position,depth,is_white)
+        self.expected=movecoords(reply)
+
+    def played(self,y,x,n,m,movetime=None):
+        #the opponent's move: on a ponder hit the running search becomes the real one
+        #(put on the clock with movetime) and poll() returns its move; on a miss it is
+        #cancelled. False when nothing was pondered or the guess was wrong
+        if self.expected is None:
+            return False
+        hit=self.expected==(y,x,n,m)
+        self.expected=None
+        if hit:
+            self.ai.ponderhit(movetime)
+        else:
+            self.cancel()
+        return hit
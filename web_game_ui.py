@@ -317,7 +317,7 @@ class WebGameUI:
             elif 80 <= y <= 120 and self.game_mode in ['ai', '2player', 'tutorial']: # Hint
                 is_white = (self.game.turn % 2 == 0)
                 # Use a lower depth for hints to be quick
-                hy, hx, hfx, hfy = self.game.get_ai_move(is_white, depth=2)
+                hy, hx, hfx, hfy, _ = self.game.get_ai_move(is_white, depth=2)
                 self.hint_move = [[hy, hx], [hfx, hfy]]
             return
 
@@ -423,7 +423,7 @@ class WebGameUI:
                     {'pos': tile.position, 'piece': self._serialize_piece(tile.pieceonTile)}
                     for tile in row
                 ]
-                for row in hist_entry[0]
+                for row in getattr(hist_entry[0], 'gameTiles', hist_entry[0])
             ]
             serializable_history.append((hist_tiles, hist_entry[1], hist_entry[2], hist_entry[3], hist_entry[4], hist_entry[5], hist_entry[6]))
         serializable_state['history'] = serializable_history
@@ -538,10 +538,12 @@ class WebGameUI:
 
                 if self.game_mode == 'ai' and self.game.get_current_player_alliance() == 'Black':
                     # AI's turn
-                    ai_start_r, ai_start_c, ai_end_r, ai_end_c = self.game.get_ai_move(False)
+                    ai_start_r, ai_start_c, ai_end_r, ai_end_c, ai_promotion = self.game.get_ai_move(False)
                     if ai_start_r is not None:
                         success, is_capture = self.game.apply_move(ai_start_r, ai_start_c, ai_end_r, ai_end_c)
                         if success:
+                            if self.game.promotion_pending: # Promote to the piece the search chose
+                                self.game.promote_pawn(ai_end_r, ai_end_c, ai_promotion or 'Q')
                             if is_capture: self.capture_sound.play()
                             else: self.move_sound.play()
                             # Small delay for AI move to be visible
@@ -554,10 +556,12 @@ class WebGameUI:
                 elif self.game_mode == 'spectator':
                     # Both AIs play
                     current_alliance = self.game.get_current_player_alliance()
-                    ai_start_r, ai_start_c, ai_end_r, ai_end_c = self.game.get_ai_move(current_alliance == 'White')
+                    ai_start_r, ai_start_c, ai_end_r, ai_end_c, ai_promotion = self.game.get_ai_move(current_alliance == 'White')
                     if ai_start_r is not None:
                         success, is_capture = self.game.apply_move(ai_start_r, ai_start_c, ai_end_r, ai_end_c)
                         if success:
+                            if self.game.promotion_pending: # Promote to the piece the search chose
+                                self.game.promote_pawn(ai_end_r, ai_end_c, ai_promotion or 'Q')
                             if is_capture: self.capture_sound.play()
                             else: self.move_sound.play()
                             await asyncio.sleep(0.5)
@@ -567,10 +571,12 @@ class WebGameUI:
 
                 elif self.game_mode == 'tutorial' and self.game.get_current_player_alliance() == 'Black':
                     # Tutorial AI (Black)
-                    ai_start_r, ai_start_c, ai_end_r, ai_end_c = self.game.get_ai_move(False, depth=2) # Lower depth for tutorial AI
+                    ai_start_r, ai_start_c, ai_end_r, ai_end_c, ai_promotion = self.game.get_ai_move(False, depth=2) # Lower depth for tutorial AI
                     if ai_start_r is not None:
                         success, is_capture = self.game.apply_move(ai_start_r, ai_start_c, ai_end_r, ai_end_c)
                         if success:
+                            if self.game.promotion_pending: # Promote to the piece the search chose
+                                self.game.promote_pawn(ai_end_r, ai_end_c, ai_promotion or 'Q')
                             if is_capture: self.capture_sound.play()
                             else: self.move_sound.play()
                             await asyncio.sleep(0.5)